@@ -5,7 +5,7 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from enum import Enum
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Any, Callable
 
 if TYPE_CHECKING:
     from phone_agent.adb import ADBDevice
@@ -61,20 +61,23 @@ class ActionHandler:
             ActionType.PAUSE: self._handle_pause,
         }
 
-    def execute(self, action_json: str) -> ActionResult:
+    def execute(self, action: dict[str, Any] | str) -> ActionResult:
         """
         执行动作
 
         Args:
-            action_json: 动作 JSON 字符串
+            action: 已解析的动作字典，或动作 JSON 字符串
 
         Returns:
             ActionResult
         """
-        try:
-            action_data = json.loads(action_json)
-        except json.JSONDecodeError:
-            return ActionResult(False, False, f"无效的动作 JSON: {action_json[:100]}")
+        if isinstance(action, dict):
+            action_data = action
+        else:
+            try:
+                action_data = json.loads(action)
+            except json.JSONDecodeError:
+                return ActionResult(False, False, f"无效的动作 JSON: {action[:100]}")
 
         action_type_str = action_data.get("action")
         if not action_type_str:
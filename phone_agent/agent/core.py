@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import time
+from collections.abc import Generator
 from typing import TYPE_CHECKING, Callable
 
 from pydantic import BaseModel, Field
@@ -48,6 +49,7 @@ class StepResult(BaseModel):
 
     success: bool
     finished: bool
+    step_index: int = 0  # 步骤序号（从 1 开始）
     action: str | None = None
     thinking: str = ""
     message: str | None = None
@@ -154,6 +156,27 @@ class PhoneAgent:
         Returns:
             任务结果消息
         """
+        steps = self.iter_steps(task)
+        while True:
+            try:
+                result = next(steps)
+            except StopIteration as stop:
+                return stop.value
+
+            # 调用回调
+            if self.on_step_callback:
+                self.on_step_callback(result)
+
+    def iter_steps(self, task: str) -> Generator[StepResult, None, str]:
+        """
+        逐步执行任务，每完成一步产出一个 StepResult
+
+        调用方按需驱动（例如在线程池中逐次调用 next），
+        生成器结束时通过 StopIteration.value 返回任务结果消息
+
+        Args:
+            task: 用户任务描述
+        """
         self.reset()
 
         # 构建系统 Prompt
@@ -194,9 +217,7 @@ class PhoneAgent:
 
             self._total_cost += result.step_cost
 
-            # 调用回调
-            if self.on_step_callback:
-                self.on_step_callback(result)
+            yield result
 
             if self.config.verbose:
                 self._print_step_result(result)
@@ -259,6 +280,7 @@ class PhoneAgent:
         
         thinking = response.thinking
         action = response.action
+        action_text = response.action_json
         raw_content = response.raw_content
         
         # 尝试解析任务阶段信息
@@ -310,7 +332,7 @@ class PhoneAgent:
                 step=self._step_count,
                 phase="thinking",
                 thinking=thinking,
-                action=action or "(规划中...)",
+                action=action_text or "(规划中...)",
             ))
 
         # 4.6 检查是否是规划阶段（无需执行动作）
@@ -338,7 +360,7 @@ class PhoneAgent:
         else:
             # 5. 执行前验证：检测屏幕是否已变化
             screen_changed = False
-            if action and not action.startswith('{"action": "Wait"'):
+            if action and action.get("action") != "Wait":
                 try:
                     # 重新截图
                     verify_screenshot = self.device.screenshot(scale=self.config.screenshot_scale)
@@ -360,7 +382,8 @@ class PhoneAgent:
                     ))
             
             # 5. 执行动作（无论是否变化都执行）
-            action_result = self.action_handler.execute(action)
+            # 无法解析出动作时交给 ActionHandler 报告原始内容
+            action_result = self.action_handler.execute(action or raw_content)
             
             # 如果检测到变化，在结果中添加提示
             if screen_changed and action_result.message:
@@ -371,7 +394,7 @@ class PhoneAgent:
             self.on_progress_callback(ProgressUpdate(
                 step=self._step_count,
                 phase="action",
-                action=action,
+                action=action_text,
                 message=action_result.message or "",
             ))
 
@@ -434,7 +457,8 @@ class PhoneAgent:
         return StepResult(
             success=action_result.success,
             finished=action_result.should_finish,
-            action=action,
+            step_index=self._step_count,
+            action=action_text,
             thinking=thinking,
             message=action_result.message,
             step_cost=step_cost,
@@ -466,7 +490,7 @@ class PhoneAgent:
     def _print_step_result(self, result: StepResult) -> None:
         """打印步骤结果"""
         status = "✅" if result.success else "❌"
-        print(f"\n[步骤 {self._step_count}] {status}")
+        print(f"\n[步骤 {result.step_index}] {status}")
 
         if result.thinking:
             # 只显示前 100 字符
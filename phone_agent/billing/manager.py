@@ -229,6 +229,12 @@ class BillingManager:
             records=self._usage_records,
         )
 
+    def new_session(self) -> BillingManager:
+        """创建共享价格表、用量独立的新计费管理器（无需重新加载配置）"""
+        manager = BillingManager()
+        manager._pricing_registry = self._pricing_registry
+        return manager
+
     def reset(self) -> None:
         """重置计费统计（新任务时调用）"""
         self._usage_records.clear()
@@ -60,6 +60,9 @@ class Settings(BaseSettings):
     screenshot_scale: float = Field(default=1.0, description="截图缩放比例")
     summarize_interval: int = Field(default=5, description="每 N 步执行一次历史摘要（0=不摘要）")
 
+    # TUI 配置
+    tui_log_max_lines: int = Field(default=5000, description="TUI 日志面板保留的最大行数")
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -9,7 +9,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import yaml
 from pydantic import BaseModel, Field
@@ -39,6 +39,11 @@ class AppPromptConfig(BaseModel):
     aliases: list[str] = Field(default_factory=list)
     system_prompt: str = ""
     scenarios: dict[str, dict] | None = None
+    rendered_section: str = Field(default="", exclude=True, description="预渲染的 Prompt 段落")
+
+    def model_post_init(self, __context: Any) -> None:
+        # 加载时一次性渲染段落，避免每步重复格式化
+        self.rendered_section = f"\n## {self.name} 操作指南\n\n{self.system_prompt}"
 
 
 class FeaturePromptConfig(BaseModel):
@@ -48,6 +53,10 @@ class FeaturePromptConfig(BaseModel):
     trigger_keywords: list[str] = Field(default_factory=list)
     system_prompt: str = ""
     examples: list[str] | None = None
+    rendered_section: str = Field(default="", exclude=True, description="预渲染的 Prompt 段落")
+
+    def model_post_init(self, __context: Any) -> None:
+        self.rendered_section = f"\n## {self.name}功能提示\n\n{self.system_prompt}"
 
 
 class PromptManager:
@@ -191,15 +200,14 @@ class PromptManager:
             app_config = self._detect_app_from_task(context.task)
         
         if app_config and app_config.system_prompt:
-            parts.append(f"\n## {app_config.name} 操作指南\n\n{app_config.system_prompt}")
+            parts.append(app_config.rendered_section)
             # 调试输出
             print(f"📄 已加载专属提示词: {app_config.name}")
 
         # 3. 功能描述词
         feature = context.detected_feature or self.detect_feature(context.task)
         if feature and feature in self._feature_prompts:
-            feature_config = self._feature_prompts[feature]
-            parts.append(f"\n## {feature_config.name}功能提示\n\n{feature_config.system_prompt}")
+            parts.append(self._feature_prompts[feature].rendered_section)
 
         # 4. 设备和上下文信息
         context_info = self._build_context_info(context)
@@ -1,10 +1,11 @@
 """VLM Provider adapters for multiple model providers."""
 
-from .base import BaseVLMClient, VLMResponse
+from .base import BaseVLMClient, LRUResponseCache, VLMResponse
 from .factory import create_vlm_client, create_vlm_client_from_profile
 
 __all__ = [
     "BaseVLMClient",
+    "LRUResponseCache",
     "VLMResponse",
     "create_vlm_client",
     "create_vlm_client_from_profile",
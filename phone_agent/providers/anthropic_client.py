@@ -2,12 +2,23 @@
 
 from __future__ import annotations
 
-import base64
+import asyncio
+from collections.abc import MutableMapping
 from typing import Any
 
 import anthropic
+import httpx
 
-from .base import BaseVLMClient, VLMResponse
+from .base import (
+    DEFAULT_HTTP_LIMITS,
+    BaseVLMClient,
+    VLMResponse,
+    encode_image_base64,
+    get_loop_client,
+    get_shared_client,
+    http_limits_key,
+    strip_image_parts,
+)
 
 
 class AnthropicClient(BaseVLMClient):
@@ -19,32 +30,51 @@ class AnthropicClient(BaseVLMClient):
         model: str,
         base_url: str | None = None,
         max_tokens: int = 4096,
+        http_limits: httpx.Limits | None = None,
+        image_optimize: bool = True,
+        response_cache: MutableMapping[bytes, VLMResponse] | None = None,
     ) -> None:
         self.api_key = api_key
         self.model = model
         self.base_url = base_url
         self.max_tokens = max_tokens
+        self.http_limits = http_limits or DEFAULT_HTTP_LIMITS
+        self.image_optimize = image_optimize
+        self.response_cache = response_cache
 
         self._client: anthropic.Anthropic | None = None
-        self._async_client: anthropic.AsyncAnthropic | None = None
+
+    def _client_kwargs(self) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {"api_key": self.api_key}
+        if self.base_url:
+            kwargs["base_url"] = self.base_url
+        return kwargs
+
+    def _client_key(self, kind: str) -> tuple:
+        return ("anthropic", kind, self.api_key, self.base_url, http_limits_key(self.http_limits))
 
     @property
     def client(self) -> anthropic.Anthropic:
         if self._client is None:
-            kwargs = {"api_key": self.api_key}
-            if self.base_url:
-                kwargs["base_url"] = self.base_url
-            self._client = anthropic.Anthropic(**kwargs)
+            self._client = get_shared_client(
+                self._client_key("sync"),
+                lambda: anthropic.Anthropic(
+                    **self._client_kwargs(),
+                    http_client=anthropic.DefaultHttpxClient(limits=self.http_limits),
+                ),
+            )
         return self._client
 
     @property
     def async_client(self) -> anthropic.AsyncAnthropic:
-        if self._async_client is None:
-            kwargs = {"api_key": self.api_key}
-            if self.base_url:
-                kwargs["base_url"] = self.base_url
-            self._async_client = anthropic.AsyncAnthropic(**kwargs)
-        return self._async_client
+        # 不在实例上缓存：同一实例可能先后在不同事件循环中使用
+        return get_loop_client(
+            self._client_key("async"),
+            lambda: anthropic.AsyncAnthropic(
+                **self._client_kwargs(),
+                http_client=anthropic.DefaultAsyncHttpxClient(limits=self.http_limits),
+            ),
+        )
 
     @property
     def provider_name(self) -> str:
@@ -79,31 +109,46 @@ class AnthropicClient(BaseVLMClient):
         content = []
 
         if image is not None:
-            image_b64 = base64.b64encode(image).decode("utf-8")
+            image_data, mime_type = self._prepare_image(image)
             content.append({
                 "type": "image",
                 "source": {
                     "type": "base64",
-                    "media_type": "image/png",
-                    "data": image_b64,
+                    "media_type": mime_type,
+                    "data": encode_image_base64(image_data),
                 },
             })
 
         content.append({"type": "text", "text": text})
         return content
 
-    def request(
+    def _prepare_conversation(
         self,
         messages: list[dict[str, Any]],
         image: bytes | None = None,
-    ) -> VLMResponse:
-        """发送同步请求"""
+    ) -> tuple[str, list[dict[str, Any]]]:
+        """分离 system 并为最后一条用户消息附加图像（不修改调用方的消息字典）"""
         system, conversation = self._extract_system_and_messages(messages)
+        conversation = [strip_image_parts(msg) for msg in conversation]
 
-        # 处理最后一条用户消息添加图像
+        # 浅拷贝最后一条用户消息，避免图像被写回调用方的历史记录
         if conversation and conversation[-1]["role"] == "user":
             text = conversation[-1].get("content", "")
-            conversation[-1]["content"] = self._build_content(text, image)
+            conversation[-1] = {**conversation[-1], "content": self._build_content(text, image)}
+
+        return system, conversation
+
+    def request(
+        self,
+        messages: list[dict[str, Any]],
+        image: bytes | None = None,
+    ) -> VLMResponse:
+        """发送同步请求"""
+        key, cached = self._get_cached_response(messages, image)
+        if cached is not None:
+            return cached
+
+        system, conversation = self._prepare_conversation(messages, image)
 
         response = self.client.messages.create(
             model=self.model,
@@ -119,7 +164,7 @@ class AnthropicClient(BaseVLMClient):
 
         thinking, action = self.parse_response(content)
 
-        return VLMResponse(
+        result = VLMResponse(
             thinking=thinking,
             action=action,
             raw_content=content,
@@ -127,6 +172,7 @@ class AnthropicClient(BaseVLMClient):
             completion_tokens=response.usage.output_tokens,
             total_tokens=response.usage.input_tokens + response.usage.output_tokens,
         )
+        return self._store_response(key, result)
 
     async def request_async(
         self,
@@ -134,11 +180,14 @@ class AnthropicClient(BaseVLMClient):
         image: bytes | None = None,
     ) -> VLMResponse:
         """发送异步请求"""
-        system, conversation = self._extract_system_and_messages(messages)
+        key, cached = self._get_cached_response(messages, image)
+        if cached is not None:
+            return cached
 
-        if conversation and conversation[-1]["role"] == "user":
-            text = conversation[-1].get("content", "")
-            conversation[-1]["content"] = self._build_content(text, image)
+        # 图像压缩/编码为纯 CPU 操作，放到线程中避免阻塞事件循环
+        system, conversation = await asyncio.to_thread(
+            self._prepare_conversation, messages, image
+        )
 
         response = await self.async_client.messages.create(
             model=self.model,
@@ -154,7 +203,7 @@ class AnthropicClient(BaseVLMClient):
 
         thinking, action = self.parse_response(content)
 
-        return VLMResponse(
+        result = VLMResponse(
             thinking=thinking,
             action=action,
             raw_content=content,
@@ -162,3 +211,4 @@ class AnthropicClient(BaseVLMClient):
             completion_tokens=response.usage.output_tokens,
             total_tokens=response.usage.input_tokens + response.usage.output_tokens,
         )
+        return self._store_response(key, result)
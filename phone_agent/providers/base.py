@@ -2,28 +2,306 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import re
+import threading
+import weakref
 from abc import ABC, abstractmethod
-from typing import Any
+from collections import OrderedDict
+from collections.abc import Callable, MutableMapping
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, TypeVar
 
-from pydantic import BaseModel, Field
+import httpx
 
+# 尝试导入 orjson（可选依赖，更快的 JSON 解析/序列化）
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-class VLMResponse(BaseModel):
+# 尝试导入 pybase64（可选依赖，SIMD 加速）
+try:
+    from pybase64 import b64encode_as_string as _b64encode_as_string
+except ImportError:
+    def _b64encode_as_string(data: bytes) -> str:
+        return base64.b64encode(data).decode("ascii")
+
+
+T = TypeVar("T")
+
+# parse_response 热路径：模块加载时预编译
+_CODE_BLOCK_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)\s*```")
+_JSON_DECODER = json.JSONDecoder()
+# orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，异常处理无需区分
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_dumps(obj: Any, sort_keys: bool = False) -> str:
+    """序列化为 JSON 字符串（保留非 ASCII 字符）"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=str, option=option).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, sort_keys=sort_keys, default=str)
+
+
+# SDK 底层 HTTP 连接池默认配置：长任务多轮请求复用 keep-alive 连接
+DEFAULT_HTTP_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0,
+)
+
+
+def http_limits_key(limits: httpx.Limits) -> tuple:
+    """httpx.Limits 不可哈希，转换为可作为缓存 key 的元组"""
+    return (limits.max_connections, limits.max_keepalive_connections, limits.keepalive_expiry)
+
+
+# 进程级 SDK 客户端缓存：相同 (协议, api_key, base_url, headers) 共享连接池
+_SHARED_CLIENTS: dict[tuple, Any] = {}
+_SHARED_CLIENTS_LOCK = threading.Lock()
+
+
+def get_shared_client(key: tuple, factory: Callable[[], T]) -> T:
+    """按 key 获取共享的 SDK 客户端，不存在时调用 factory 创建"""
+    client = _SHARED_CLIENTS.get(key)
+    if client is None:
+        with _SHARED_CLIENTS_LOCK:
+            client = _SHARED_CLIENTS.get(key)
+            if client is None:
+                client = factory()
+                _SHARED_CLIENTS[key] = client
+    return client
+
+
+# 异步客户端的连接池绑定创建时的事件循环，按运行中的事件循环分别缓存；
+# 事件循环被回收后对应的客户端随之释放
+_LOOP_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, Any]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_loop_client(key: tuple, factory: Callable[[], T]) -> T:
+    """在当前运行的事件循环内按 key 获取共享的异步 SDK 客户端（须在协程中调用）"""
+    loop = asyncio.get_running_loop()
+    with _SHARED_CLIENTS_LOCK:
+        clients = _LOOP_CLIENTS.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = factory()
+            clients[key] = client
+    return client
+
+
+_IMAGE_PART_TYPES = frozenset({"image", "image_url"})
+
+
+def strip_image_parts(message: dict[str, Any]) -> dict[str, Any]:
+    """移除历史消息中的图像内容块，只保留文本（不修改原消息）"""
+    content = message.get("content")
+    if not isinstance(content, list):
+        return message
+    return {
+        **message,
+        "content": [
+            part for part in content
+            if not (isinstance(part, dict) and part.get("type") in _IMAGE_PART_TYPES)
+        ],
+    }
+
+
+def image_mime_type(image: bytes) -> str:
+    """根据文件头判断图像 MIME 类型（ADBDevice.screenshot 输出 JPEG）"""
+    if image[:2] == b"\xff\xd8":
+        return "image/jpeg"
+    return "image/png"
+
+
+# VLM 视觉编码器通常会把长边缩到 ~1568px，超出部分只会浪费带宽
+IMAGE_MAX_EDGE = 1568
+IMAGE_JPEG_QUALITY = 85
+
+
+@lru_cache(maxsize=8)
+def prepare_image(
+    image: bytes,
+    max_edge: int = IMAGE_MAX_EDGE,
+    jpeg_quality: int = IMAGE_JPEG_QUALITY,
+) -> tuple[bytes, str]:
+    """
+    上传前压缩截图：长边缩放到 max_edge 以内并编码为 JPEG
+
+    已满足条件的 JPEG 直接原样返回（只读取文件头，不解码像素）
+
+    Returns:
+        (图像数据, MIME 类型)
+    """
+    # 仅在首次压缩截图时加载 PIL，避免导入 providers 包时拖慢冷启动
+    from PIL import Image
+
+    try:
+        img = Image.open(io.BytesIO(image))
+        if max(img.size) <= max_edge and img.format == "JPEG":
+            return image, "image/jpeg"
+
+        img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=jpeg_quality, optimize=True)
+        return buffer.getvalue(), "image/jpeg"
+    except Exception:
+        # 无法识别的图像数据原样发送
+        return image, image_mime_type(image)
+
+
+@lru_cache(maxsize=32)
+def encode_image_base64(image: bytes) -> str:
+    """图像 base64 编码（按字节内容缓存，相同截图跨轮次复用）"""
+    return _b64encode_as_string(image)
+
+
+@dataclass(slots=True)
+class VLMResponse:
     """统一响应格式"""
 
-    thinking: str = Field(default="", description="模型思考过程")
-    action: str = Field(default="", description="动作 JSON 字符串")
-    raw_content: str = Field(default="", description="原始响应内容")
-    
+    thinking: str = ""  # 模型思考过程
+    action: dict[str, Any] = field(default_factory=dict)  # 动作数据 (action/params)
+    raw_content: str = ""  # 原始响应内容
+
     # Token 统计 (用于计费)
-    prompt_tokens: int = Field(default=0, description="输入 tokens")
-    completion_tokens: int = Field(default=0, description="输出 tokens")
-    total_tokens: int = Field(default=0, description="总 tokens")
+    prompt_tokens: int = 0  # 输入 tokens
+    completion_tokens: int = 0  # 输出 tokens
+    total_tokens: int = 0  # 总 tokens
+
+    @property
+    def action_json(self) -> str:
+        """动作的 JSON 字符串形式（仅用于展示/日志，按需序列化）"""
+        return _json_dumps(self.action) if self.action else ""
+
+
+class LRUResponseCache(MutableMapping):
+    """线程安全的 LRU 响应缓存 (key -> VLMResponse)"""
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[bytes, VLMResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: bytes) -> VLMResponse:
+        with self._lock:
+            value = self._data[key]
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: bytes, value: VLMResponse) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __delitem__(self, key: bytes) -> None:
+        with self._lock:
+            del self._data[key]
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def response_cache_key(messages: list[dict[str, Any]], image: bytes | None) -> bytes:
+    """根据消息内容和图像字节计算缓存 key"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_json_dumps(messages, sort_keys=True).encode("utf-8"))
+    if image:
+        digest.update(image)
+    return digest.digest()
+
+
+def _extract_action(data: dict) -> dict[str, Any]:
+    """从数据中提取动作字典"""
+    # 如果有 phase 字段，只提取 action 和 params
+    if "phase" in data:
+        if data.get("phase") == "plan":
+            return {}  # plan 阶段无需动作
+        # execute/finish 阶段，只提取 action 和 params
+        action_data = {}
+        if "action" in data:
+            action_data["action"] = data["action"]
+        if "params" in data:
+            action_data["params"] = data["params"]
+        return action_data
+    else:
+        # 老格式：排除 thinking，保留其他
+        return {k: v for k, v in data.items() if k != "thinking"}
+
+
+def _find_json_object(text: str) -> dict | None:
+    """找到第一个完整的 JSON 对象并解析（C 实现的 raw_decode 处理嵌套）"""
+    start = text.find('{')
+    if start == 0:
+        # 整段即为 JSON 的常见情况：优先整体解析（可用 orjson 加速）
+        try:
+            obj = _json_loads(text)
+            if isinstance(obj, dict):
+                return obj
+        except json.JSONDecodeError:
+            pass
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+            return obj
+        except json.JSONDecodeError:
+            start = text.find('{', start + 1)
+    return None
 
 
 class BaseVLMClient(ABC):
     """VLM 客户端抽象基类"""
 
+    # 是否在上传前压缩截图（子类构造函数可覆盖）
+    image_optimize: bool = True
+
+    # 可选的响应缓存（None 表示不缓存）
+    response_cache: MutableMapping[bytes, VLMResponse] | None = None
+
+    def _get_cached_response(
+        self,
+        messages: list[dict[str, Any]],
+        image: bytes | None,
+    ) -> tuple[bytes | None, VLMResponse | None]:
+        """查询响应缓存，返回 (key, 命中的响应)"""
+        if self.response_cache is None:
+            return None, None
+        key = response_cache_key(messages, image)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            # 命中缓存没有产生实际调用，不计 token
+            cached = replace(cached, prompt_tokens=0, completion_tokens=0, total_tokens=0)
+        return key, cached
+
+    def _store_response(self, key: bytes | None, response: VLMResponse) -> VLMResponse:
+        """写入响应缓存并返回响应"""
+        if key is not None and self.response_cache is not None:
+            self.response_cache[key] = response
+        return response
+
+    def _prepare_image(self, image: bytes) -> tuple[bytes, str]:
+        """按配置压缩图像，返回 (图像数据, MIME 类型)"""
+        if self.image_optimize:
+            return prepare_image(image)
+        return image, image_mime_type(image)
+
     @abstractmethod
     def request(
         self,
@@ -63,93 +341,32 @@ class BaseVLMClient(ABC):
         """模型名称 (用于计费查找)"""
         pass
 
-    def parse_response(self, raw_content: str) -> tuple[str, str]:
+    def parse_response(self, raw_content: str) -> tuple[str, dict[str, Any]]:
         """
         解析响应为 (thinking, action)
         
-        默认实现尝试从 JSON 中提取 thinking 和 action
+        默认实现尝试从 JSON 中提取 thinking 和 action 字典，
+        无法解析时 action 为空字典
         """
-        import json
-        import re
-
-        thinking = ""
-        action = ""
-        
-        def extract_action_json(data: dict) -> str:
-            """从数据中提取动作 JSON"""
-            # 如果有 phase 字段，只提取 action 和 params
-            if "phase" in data:
-                if data.get("phase") == "plan":
-                    return ""  # plan 阶段无需动作
-                # execute/finish 阶段，只提取 action 和 params
-                action_data = {}
-                if "action" in data:
-                    action_data["action"] = data["action"]
-                if "params" in data:
-                    action_data["params"] = data["params"]
-                if action_data:
-                    return json.dumps(action_data, ensure_ascii=False)
-                return ""
-            else:
-                # 老格式：排除 thinking，保留其他
-                return json.dumps(
-                    {k: v for k, v in data.items() if k != "thinking"},
-                    ensure_ascii=False,
-                )
-
-        def find_json_object(text: str) -> str | None:
-            """找到完整的 JSON 对象（处理嵌套）"""
-            start = text.find('{')
-            if start == -1:
-                return None
-            
-            depth = 0
-            in_string = False
-            escape = False
-            
-            for i, char in enumerate(text[start:], start):
-                if escape:
-                    escape = False
-                    continue
-                if char == '\\':
-                    escape = True
-                    continue
-                if char == '"' and not escape:
-                    in_string = not in_string
-                    continue
-                if in_string:
-                    continue
-                if char == '{':
-                    depth += 1
-                elif char == '}':
-                    depth -= 1
-                    if depth == 0:
-                        return text[start:i+1]
-            return None
+        # 快速路径：纯 JSON 响应直接解码，跳过正则扫描
+        # （以 ``` 开头的响应会在下面的正则处立即命中）
+        stripped = raw_content.lstrip()
+        if stripped.startswith("{"):
+            data = _find_json_object(stripped)
+            if data is not None:
+                return data.get("thinking", ""), _extract_action(data)
 
         # 尝试提取 JSON 块（代码块格式）
-        code_block_match = re.search(r"```(?:json)?\s*([\s\S]*?)\s*```", raw_content)
+        code_block_match = _CODE_BLOCK_RE.search(raw_content)
         if code_block_match:
-            json_str = find_json_object(code_block_match.group(1))
-            if json_str:
-                try:
-                    data = json.loads(json_str)
-                    thinking = data.get("thinking", "")
-                    action = extract_action_json(data)
-                    return thinking, action
-                except json.JSONDecodeError:
-                    pass
+            data = _find_json_object(code_block_match.group(1))
+            if data is not None:
+                return data.get("thinking", ""), _extract_action(data)
 
         # 尝试从原始内容找 JSON 对象
-        json_str = find_json_object(raw_content)
-        if json_str:
-            try:
-                data = json.loads(json_str)
-                thinking = data.get("thinking", "")
-                action = extract_action_json(data)
-                return thinking, action
-            except json.JSONDecodeError:
-                pass
-
-        # 无法解析，返回原始内容
-        return "", raw_content
+        data = _find_json_object(raw_content)
+        if data is not None:
+            return data.get("thinking", ""), _extract_action(data)
+
+        # 无法解析，原始内容保留在 VLMResponse.raw_content
+        return "", {}
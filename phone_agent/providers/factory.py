@@ -5,9 +5,6 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from .base import BaseVLMClient
-from .openai_client import OpenAIClient
-from .anthropic_client import AnthropicClient
-from .gemini_client import GeminiClient
 
 if TYPE_CHECKING:
     from phone_agent.config import ModelProfile
@@ -37,7 +34,10 @@ def create_vlm_client(
     """
     protocol = protocol.lower()
 
+    # 按需导入各提供商 SDK，避免启动时加载全部依赖
     if protocol == "openai":
+        from .openai_client import OpenAIClient
+
         return OpenAIClient(
             api_key=api_key,
             model=model,
@@ -46,6 +46,8 @@ def create_vlm_client(
             **kwargs,
         )
     elif protocol == "anthropic":
+        from .anthropic_client import AnthropicClient
+
         return AnthropicClient(
             api_key=api_key,
             model=model,
@@ -53,6 +55,8 @@ def create_vlm_client(
             **kwargs,
         )
     elif protocol == "google":
+        from .gemini_client import GeminiClient
+
         return GeminiClient(
             api_key=api_key,
             model=model,
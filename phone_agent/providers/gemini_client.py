@@ -3,11 +3,10 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import MutableMapping
 from typing import Any
 
 import google.generativeai as genai
-from PIL import Image
-import io
 
 from .base import BaseVLMClient, VLMResponse
 
@@ -21,24 +20,34 @@ class GeminiClient(BaseVLMClient):
         model: str = "gemini-2.0-flash",
         temperature: float = 0.7,
         max_output_tokens: int = 4096,
+        image_optimize: bool = True,
+        response_cache: MutableMapping[bytes, VLMResponse] | None = None,
     ) -> None:
         self.api_key = api_key
         self.model = model
         self.temperature = temperature
         self.max_output_tokens = max_output_tokens
+        self.image_optimize = image_optimize
+        self.response_cache = response_cache
 
         # 配置 API
         genai.configure(api_key=api_key)
 
+        self._generation_config = {
+            "temperature": temperature,
+            "max_output_tokens": max_output_tokens,
+        }
+
         # 创建模型实例
         self._model = genai.GenerativeModel(
             model_name=model,
-            generation_config={
-                "temperature": temperature,
-                "max_output_tokens": max_output_tokens,
-            },
+            generation_config=self._generation_config,
         )
 
+        # 带系统提示的模型实例缓存（仅在系统提示变化时重建）
+        self._last_system: str | None = None
+        self._system_model: genai.GenerativeModel | None = None
+
     @property
     def provider_name(self) -> str:
         return "Google"
@@ -47,6 +56,19 @@ class GeminiClient(BaseVLMClient):
     def model_name(self) -> str:
         return self.model
 
+    def _get_model(self, system: str) -> genai.GenerativeModel:
+        """获取模型实例，系统提示不变时复用上次构建的实例"""
+        if not system:
+            return self._model
+        if self._system_model is None or system != self._last_system:
+            self._system_model = genai.GenerativeModel(
+                model_name=self.model,
+                generation_config=self._generation_config,
+                system_instruction=system,
+            )
+            self._last_system = system
+        return self._system_model
+
     def _extract_system_prompt(
         self,
         messages: list[dict[str, Any]],
@@ -77,10 +99,10 @@ class GeminiClient(BaseVLMClient):
 
             parts = []
 
-            # 如果是最后一条用户消息且有图像
+            # 如果是最后一条用户消息且有图像（直接传原始字节，无需 PIL 解码）
             if i == len(messages) - 1 and msg["role"] == "user" and image:
-                img = Image.open(io.BytesIO(image))
-                parts.append(img)
+                image_data, mime_type = self._prepare_image(image)
+                parts.append({"mime_type": mime_type, "data": image_data})
 
             parts.append(content)
 
@@ -91,35 +113,22 @@ class GeminiClient(BaseVLMClient):
 
         return gemini_messages
 
-    def request(
+    def _prepare(
         self,
         messages: list[dict[str, Any]],
-        image: bytes | None = None,
-    ) -> VLMResponse:
-        """发送同步请求"""
+        image: bytes | None,
+    ) -> tuple[genai.GenerativeModel, list[dict[str, Any]], list[Any]]:
+        """准备模型、历史消息和最后一条消息的 parts"""
         system, conversation = self._extract_system_prompt(messages)
-
-        # 如果有系统提示，创建新的模型实例
-        model = self._model
-        if system:
-            model = genai.GenerativeModel(
-                model_name=self.model,
-                generation_config={
-                    "temperature": self.temperature,
-                    "max_output_tokens": self.max_output_tokens,
-                },
-                system_instruction=system,
-            )
-
+        model = self._get_model(system)
         gemini_messages = self._convert_to_gemini_messages(conversation, image)
 
-        # 使用 chat 模式
-        chat = model.start_chat(history=gemini_messages[:-1] if len(gemini_messages) > 1 else [])
-
-        # 发送最后一条消息
-        last_msg = gemini_messages[-1] if gemini_messages else {"parts": [""]}
-        response = chat.send_message(last_msg["parts"])
+        history = gemini_messages[:-1]
+        last_parts = gemini_messages[-1]["parts"] if gemini_messages else [""]
+        return model, history, last_parts
 
+    def _to_vlm_response(self, response: Any) -> VLMResponse:
+        """将 Gemini 响应转换为统一格式"""
         content = response.text
 
         thinking, action = self.parse_response(content)
@@ -138,13 +147,42 @@ class GeminiClient(BaseVLMClient):
             total_tokens=prompt_tokens + completion_tokens,
         )
 
+    def request(
+        self,
+        messages: list[dict[str, Any]],
+        image: bytes | None = None,
+    ) -> VLMResponse:
+        """发送同步请求"""
+        key, cached = self._get_cached_response(messages, image)
+        if cached is not None:
+            return cached
+
+        model, history, last_parts = self._prepare(messages, image)
+
+        if history:
+            # 多轮对话使用 chat 模式
+            response = model.start_chat(history=history).send_message(last_parts)
+        else:
+            response = model.generate_content(last_parts)
+
+        return self._store_response(key, self._to_vlm_response(response))
+
     async def request_async(
         self,
         messages: list[dict[str, Any]],
         image: bytes | None = None,
     ) -> VLMResponse:
-        """发送异步请求 (使用线程池执行同步方法)"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, lambda: self.request(messages, image)
-        )
+        """发送异步请求 (使用 SDK 原生异步接口)"""
+        key, cached = self._get_cached_response(messages, image)
+        if cached is not None:
+            return cached
+
+        # 图像压缩为纯 CPU 操作，放到线程中避免阻塞事件循环
+        model, history, last_parts = await asyncio.to_thread(self._prepare, messages, image)
+
+        if history:
+            response = await model.start_chat(history=history).send_message_async(last_parts)
+        else:
+            response = await model.generate_content_async(last_parts)
+
+        return self._store_response(key, self._to_vlm_response(response))
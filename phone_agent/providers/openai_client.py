@@ -2,12 +2,23 @@
 
 from __future__ import annotations
 
-import base64
+import asyncio
+from collections.abc import MutableMapping
 from typing import Any
 
-from openai import OpenAI, AsyncOpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 
-from .base import BaseVLMClient, VLMResponse
+from .base import (
+    DEFAULT_HTTP_LIMITS,
+    BaseVLMClient,
+    VLMResponse,
+    encode_image_base64,
+    get_loop_client,
+    get_shared_client,
+    http_limits_key,
+    strip_image_parts,
+)
 
 
 class OpenAIClient(BaseVLMClient):
@@ -24,6 +35,9 @@ class OpenAIClient(BaseVLMClient):
         extra_headers: dict[str, str] | None = None,
         temperature: float = 0.7,
         max_tokens: int = 4096,
+        http_limits: httpx.Limits | None = None,
+        image_optimize: bool = True,
+        response_cache: MutableMapping[bytes, VLMResponse] | None = None,
     ) -> None:
         self.api_key = api_key
         self.model = model
@@ -31,43 +45,66 @@ class OpenAIClient(BaseVLMClient):
         self.extra_headers = extra_headers
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.http_limits = http_limits or DEFAULT_HTTP_LIMITS
+        self.image_optimize = image_optimize
+        self.response_cache = response_cache
+        self._provider_name = self._detect_provider(base_url)
 
         self._client: OpenAI | None = None
-        self._async_client: AsyncOpenAI | None = None
+
+    def _client_key(self, kind: str) -> tuple:
+        headers = tuple(sorted((self.extra_headers or {}).items()))
+        return (
+            "openai", kind, self.api_key, self.base_url, headers,
+            http_limits_key(self.http_limits),
+        )
 
     @property
     def client(self) -> OpenAI:
         if self._client is None:
-            self._client = OpenAI(
-                api_key=self.api_key,
-                base_url=self.base_url,
-                default_headers=self.extra_headers,
+            self._client = get_shared_client(
+                self._client_key("sync"),
+                lambda: OpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    default_headers=self.extra_headers,
+                    http_client=DefaultHttpxClient(limits=self.http_limits),
+                ),
             )
         return self._client
 
     @property
     def async_client(self) -> AsyncOpenAI:
-        if self._async_client is None:
-            self._async_client = AsyncOpenAI(
+        # 不在实例上缓存：同一实例可能先后在不同事件循环中使用
+        return get_loop_client(
+            self._client_key("async"),
+            lambda: AsyncOpenAI(
                 api_key=self.api_key,
                 base_url=self.base_url,
                 default_headers=self.extra_headers,
-            )
-        return self._async_client
+                http_client=DefaultAsyncHttpxClient(limits=self.http_limits),
+            ),
+        )
 
-    @property
-    def provider_name(self) -> str:
-        if self.base_url:
-            if "deepseek" in self.base_url.lower():
+    @staticmethod
+    def _detect_provider(base_url: str | None) -> str:
+        """根据 base_url 推断提供商名称"""
+        if base_url:
+            url = base_url.lower()
+            if "deepseek" in url:
                 return "DeepSeek"
-            if "openrouter" in self.base_url.lower():
+            if "openrouter" in url:
                 return "OpenRouter"
-            if "volces" in self.base_url.lower():
+            if "volces" in url:
                 return "火山方舟"
-            if "localhost" in self.base_url.lower():
+            if "localhost" in url:
                 return "Local"
         return "OpenAI"
 
+    @property
+    def provider_name(self) -> str:
+        return self._provider_name
+
     @property
     def model_name(self) -> str:
         return self.model
@@ -77,18 +114,26 @@ class OpenAIClient(BaseVLMClient):
         messages: list[dict[str, Any]],
         image: bytes | None = None,
     ) -> list[dict[str, Any]]:
-        """构建消息列表，处理图像"""
+        """构建消息列表，处理图像（仅最后一条用户消息携带当前截图）"""
         result = []
 
-        for msg in messages:
-            if msg["role"] == "user" and image is not None:
+        last_user = -1
+        if image is not None:
+            for i in range(len(messages) - 1, -1, -1):
+                if messages[i]["role"] == "user":
+                    last_user = i
+                    break
+
+        for i, msg in enumerate(messages):
+            if i == last_user:
                 # 添加图像到用户消息
-                image_b64 = base64.b64encode(image).decode("utf-8")
+                image_data, mime_type = self._prepare_image(image)
+                image_b64 = encode_image_base64(image_data)
                 content = [
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/png;base64,{image_b64}",
+                            "url": f"data:{mime_type};base64,{image_b64}",
                             "detail": "high",
                         },
                     },
@@ -96,7 +141,8 @@ class OpenAIClient(BaseVLMClient):
                 ]
                 result.append({"role": "user", "content": content})
             else:
-                result.append(msg)
+                # 历史消息中的旧截图不再重复发送
+                result.append(strip_image_parts(msg))
 
         return result
 
@@ -106,6 +152,10 @@ class OpenAIClient(BaseVLMClient):
         image: bytes | None = None,
     ) -> VLMResponse:
         """发送同步请求"""
+        key, cached = self._get_cached_response(messages, image)
+        if cached is not None:
+            return cached
+
         built_messages = self._build_messages(messages, image)
 
         response = self.client.chat.completions.create(
@@ -120,7 +170,7 @@ class OpenAIClient(BaseVLMClient):
 
         thinking, action = self.parse_response(content)
 
-        return VLMResponse(
+        result = VLMResponse(
             thinking=thinking,
             action=action,
             raw_content=content,
@@ -128,6 +178,7 @@ class OpenAIClient(BaseVLMClient):
             completion_tokens=usage.completion_tokens if usage else 0,
             total_tokens=usage.total_tokens if usage else 0,
         )
+        return self._store_response(key, result)
 
     async def request_async(
         self,
@@ -135,7 +186,12 @@ class OpenAIClient(BaseVLMClient):
         image: bytes | None = None,
     ) -> VLMResponse:
         """发送异步请求"""
-        built_messages = self._build_messages(messages, image)
+        key, cached = self._get_cached_response(messages, image)
+        if cached is not None:
+            return cached
+
+        # 图像压缩/编码为纯 CPU 操作，放到线程中避免阻塞事件循环
+        built_messages = await asyncio.to_thread(self._build_messages, messages, image)
 
         response = await self.async_client.chat.completions.create(
             model=self.model,
@@ -149,7 +205,7 @@ class OpenAIClient(BaseVLMClient):
 
         thinking, action = self.parse_response(content)
 
-        return VLMResponse(
+        result = VLMResponse(
             thinking=thinking,
             action=action,
             raw_content=content,
@@ -157,3 +213,4 @@ class OpenAIClient(BaseVLMClient):
             completion_tokens=usage.completion_tokens if usage else 0,
             total_tokens=usage.total_tokens if usage else 0,
         )
+        return self._store_response(key, result)
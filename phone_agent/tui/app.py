@@ -1,13 +1,34 @@
-"""Textual TUI application for Phone Agent."""
+"""Textual TUI application for Phone Agent.
+
+性能分析：设置环境变量 PHONE_AGENT_PROFILING=1 启动（需安装 yappi），
+退出时按协程/函数的墙钟耗时写出 callgrind 格式的 phone_agent.prof，
+可用 KCachegrind/QCachegrind 查看。
+"""
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Generator
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
+from typing import Any
 
+from dotenv import load_dotenv
 from rich.console import Console
+from rich.text import Text
 from textual.app import App, ComposeResult, on
 from textual.binding import Binding
 from textual.containers import Container, Horizontal, Vertical
+from textual.timer import Timer
 from textual.widgets import (
     Button,
     Footer,
@@ -21,8 +42,57 @@ from textual.widgets import (
     Static,
 )
 
-from phone_agent.adb import DeviceInfo, DeviceManager, DeviceState
+from phone_agent.adb import ADBDevice, DeviceInfo, DeviceManager, DeviceState
+from phone_agent.agent import AgentConfig, PhoneAgent, ProgressUpdate, StepResult
+from phone_agent.billing import BillingManager, load_pricing_config
 from phone_agent.config import ProfileManager, get_settings
+from phone_agent.prompts import PromptManager
+from phone_agent.providers import create_vlm_client_from_profile
+from phone_agent.tui.screens.settings import SettingsScreen
+
+# 项目根目录下的 prompts 文件夹
+_PROMPTS_DIR = Path(__file__).resolve().parents[2] / "prompts"
+
+
+def _truncate(text: str, limit: int) -> str:
+    """超过 limit 个字符时截断并追加省略号"""
+    return text if len(text) <= limit else f"{text[:limit]}..."
+
+
+def _advance_steps(steps: Generator[StepResult, None, str]) -> tuple[bool, Any]:
+    """推进一步，返回 (是否结束, StepResult 或任务结果消息)"""
+    try:
+        return False, next(steps)
+    except StopIteration as stop:
+        return True, stop.value
+
+
+# 常见错误映射（按顺序匹配，命中第一个即返回）
+_ERROR_PATTERNS: list[tuple[re.Pattern[str], str]] = [
+    (re.compile(r"image input", re.I),
+     "错误：当前模型不支持图片输入，请切换到视觉模型（如 doubao-vision）"),
+    (re.compile(r"api key|authentication|unauthorized", re.I),
+     "错误：API Key 无效或未配置，请在设置中检查 API Key"),
+    (re.compile(r"rate limit", re.I),
+     "错误：请求过于频繁，已触发限流，请稍后再试"),
+    (re.compile(r"timeout", re.I),
+     "错误：请求超时，请检查网络连接"),
+    (re.compile(r"connection", re.I),
+     "错误：网络连接失败，请检查网络"),
+    (re.compile(r"quota|insufficient", re.I),
+     "错误：账户余额不足或配额已用完"),
+    (re.compile(r"\A(?=.*invalid)(?=.*model)", re.I | re.S),
+     "错误：模型名称无效，请检查 Profile 配置"),
+    (re.compile(r"base_url|endpoint", re.I),
+     "错误：API 地址无效，请检查 Profile 中的 Base URL 配置"),
+]
+
+
+# 设备状态图标（其他状态显示为离线）
+_STATE_ICON = {
+    DeviceState.ONLINE: "🟢",
+    DeviceState.BUSY: "🟡",
+}
 
 
 class DeviceListItem(ListItem):
@@ -31,14 +101,24 @@ class DeviceListItem(ListItem):
     def __init__(self, device: DeviceInfo) -> None:
         super().__init__()
         self.device = device
+        self._label = self._format_label(device)
+        self._label_widget = Label(self._label)
+
+    @staticmethod
+    def _format_label(device: DeviceInfo) -> str:
+        icon = _STATE_ICON.get(device.state, "🔴")
+        return f"{icon} {device.brand or ''} {device.model or device.device_id}"
 
     def compose(self) -> ComposeResult:
-        status_icon = "🟢" if self.device.state == DeviceState.ONLINE else "🔴"
-        if self.device.state == DeviceState.BUSY:
-            status_icon = "🟡"
+        yield self._label_widget
 
-        label = f"{status_icon} {self.device.brand or ''} {self.device.model or self.device.device_id}"
-        yield Label(label)
+    def update_device(self, device: DeviceInfo) -> None:
+        """更新设备信息，仅在显示内容变化时重绘"""
+        self.device = device
+        label = self._format_label(device)
+        if label != self._label:
+            self._label = label
+            self._label_widget.update(label)
 
 
 class PhoneAgentApp(App):
@@ -103,11 +183,30 @@ class PhoneAgentApp(App):
     }
     """
 
+    # 固定格式的日志行预先构建为 Text，写入时无需解析 markup
+    _NEWLINE = Text("\n")
+    _TASK_START_HEADER = Text("\n" + "=" * 50, style="bold cyan")
+    _TASK_START_FOOTER = Text("=" * 50 + "\n", style="bold cyan")
+    _TASK_DONE_HEADER = Text.assemble(("\n" + "=" * 50, "bold green"), "\n", ("✅ 任务完成", "bold green"))
+    _TASK_DONE_FOOTER = Text("=" * 50 + "\n", style="bold green")
+    _COST_SUMMARY_TITLE = Text("\n💰 成本统计:", style="cyan")
+
+    # 每个事件只做一次 str.format 的行模板和带样式的前缀片段
+    _STEP_HEADER_FMT = "\n━━━ 步骤 {} ━━━"
+    _STEP_DONE_FMT = "━━━ 步骤 {} 完成 {} ━━━"
+    _STEP_COST_FMT = "💰 成本: ¥{:.4f}"
+    _WAITING_FMT = "⏳ {}"
+    _THINKING_PREFIX = ("💭 思考: ", "yellow")
+    _ACTION_PREFIX = ("🎬 动作: ", "blue")
+    _RESULT_PREFIX = ("📝 结果: ", "green")
+
     BINDINGS = [
         Binding("q", "quit", "退出"),
         Binding("r", "refresh_devices", "刷新设备"),
         Binding("s", "open_settings", "设置"),
         Binding("ctrl+c", "quit", "退出"),
+        # 常驻绑定，action_cancel_task 在没有运行中的任务时直接返回
+        Binding("escape", "cancel_task", "取消任务", show=False),
     ]
 
     def __init__(self) -> None:
@@ -119,15 +218,31 @@ class PhoneAgentApp(App):
         )
         self.profile_manager = ProfileManager()
         self._selected_device: DeviceInfo | None = None
+        self._device_items: dict[str, DeviceListItem] = {}  # device_id -> 列表项
         self._current_agent = None  # 当前运行的 Agent
         self._task_running = False
         self._user_prefs_path = Path(".cache/user_prefs.json")  # 用户偏好文件
+        self._user_prefs: dict | None = None  # 用户偏好内存副本
+        self._user_prefs_lock = threading.Lock()  # 串行化偏好文件写入
+        self._prefs_write: Future | None = None  # 最近一次提交的偏好写入
+        self._profiles_mtime: int | None = None  # 上次加载的 profiles.yaml 修改时间
+        self._profile_options: list[tuple[str, str]] = []
+        self._log_buffer: list[Text] = []  # 待写入日志面板的行
+        self._log_flush_timer: Timer | None = None  # 缓冲区非空时的一次性刷新定时器
         
         # 任务面板
         self._show_current_task = True  # True=当前任务, False=历史
         self._current_task_info = {"name": "", "cost": 0.0, "time": 0}
-        self._task_history: list[dict] = []
+        self._task_history: deque[dict] = deque(maxlen=50)  # 最近的任务记录
         self._task_start_time: float = 0
+        self._panel_timer: Timer | None = None  # 任务面板刷新定时器
+
+        # 跨任务复用的 Prompt 和价格配置（启动时加载一次）
+        self._prompt_manager: PromptManager | None = None
+        self._billing_template: BillingManager | None = None
+
+        # 执行同步 Agent 的共享线程池（避免每个任务新建/回收线程）
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="agent")
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -155,7 +270,13 @@ class PhoneAgentApp(App):
 
         with Container(id="main-panel"):
             yield Static("📋 任务日志", classes="section-title")
-            yield RichLog(id="log-panel", highlight=True, markup=True, wrap=True)
+            yield RichLog(
+                id="log-panel",
+                highlight=True,
+                markup=True,
+                wrap=True,
+                max_lines=self.settings.tui_log_max_lines,
+            )
             
             with Horizontal(id="input-panel"):
                 yield Input(
@@ -170,87 +291,132 @@ class PhoneAgentApp(App):
 
     async def on_mount(self) -> None:
         """应用启动时"""
-        log = self.query_one("#log-panel", RichLog)
-        log.write("[green]Phone Agent 启动成功![/green]")
-        log.write("")
+        # 缓存常用控件引用，避免每次按 CSS 选择器遍历 DOM
+        self._log = self.query_one("#log-panel", RichLog)
+        self._device_list = self.query_one("#device-list", ListView)
+        self._profile_select = self.query_one("#profile-select", Select)
+        self._submit_btn = self.query_one("#submit-btn", Button)
+        self._cancel_btn = self.query_one("#cancel-btn", Button)
+        self._pause_btn = self.query_one("#pause-btn", Button)
+        self._task_input = self.query_one("#task-input", Input)
+        self._show_current_btn = self.query_one("#show-current-btn", Button)
+        self._show_history_btn = self.query_one("#show-history-btn", Button)
+        self._task_status_content = self.query_one("#task-status-content", Static)
+
+        self._buffer_log("[green]Phone Agent 启动成功![/green]")
+        self._buffer_log("")
 
         # 加载 Profile
         await self._load_profiles()
 
+        # 预加载 Prompt 和价格配置
+        self._load_task_resources()
+
         # 扫描设备
         await self._refresh_devices()
 
+    def on_unmount(self) -> None:
+        """应用退出时关闭线程池"""
+        # 尚在排队的偏好写入会随线程池一起被取消，改为在此同步写入，避免丢失最后一次选择
+        if self._prefs_write is not None and self._prefs_write.cancel():
+            self._write_user_prefs()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
     async def _load_profiles(self) -> None:
-        """加载 Profile 配置"""
-        log = self.query_one("#log-panel", RichLog)
-        select = self.query_one("#profile-select", Select)
+        """加载 Profile 配置（启动时及关闭设置界面后调用，文件未修改时跳过）"""
+        select = self._profile_select
 
         try:
             profiles_path = self.settings.profiles_config_path
             if profiles_path.exists():
-                self.profile_manager.load_from_yaml(profiles_path)
-                log.write(f"[blue]已加载 {len(self.profile_manager)} 个 Profile[/blue]")
+                # 配置文件未修改时保留现有选项，避免重复解析和 Select 重绘
+                mtime = profiles_path.stat().st_mtime_ns
+                if mtime == self._profiles_mtime:
+                    return
+
+                # YAML 读取和解析放到线程池中，避免阻塞界面；
+                # 解析到新的 ProfileManager 后再替换（load_from_yaml 只会追加，已删除的 Profile 需要清掉）
+                manager = ProfileManager()
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(self._executor, manager.load_from_yaml, profiles_path)
+                self.profile_manager = manager
+                self._buffer_log(f"[blue]已加载 {len(self.profile_manager)} 个 Profile[/blue]")
 
                 # 按 vendor 分组显示
                 all_profiles = self.profile_manager.get_all_profiles()
                 
-                # 按 vendor 分组
-                grouped: dict[str, list[tuple[str, str, str]]] = {}
+                # 按 vendor 分组，显示名称：description 或 model 名
+                grouped: defaultdict[str, list[tuple[str, str]]] = defaultdict(list)
                 for name, p in all_profiles.items():
-                    vendor = p.vendor
-                    if vendor not in grouped:
-                        grouped[vendor] = []
-                    # 显示名称：description 或 model 名
-                    display = p.description or p.model
-                    if p.is_free:
-                        display += " 🆓"
-                    grouped[vendor].append((name, display, vendor))
+                    display = (p.description or p.model) + (" 🆓" if p.is_free else "")
+                    grouped[p.vendor].append((name, display))
                 
-                # 构建选项列表（带 vendor 分隔标题）
+                # 构建选项列表（带 vendor 分隔标题，使用特殊前缀标记）
                 options = []
-                for vendor in sorted(grouped.keys()):
-                    # 添加 vendor 作为分隔标题（使用特殊前缀标记）
+                for vendor in sorted(grouped):
                     options.append((f"━━ {vendor} ━━", f"__vendor__{vendor}"))
-                    for name, display, _ in grouped[vendor]:
-                        options.append((f"    {display}", name))
+                    options.extend((f"    {display}", name) for name, display in grouped[vendor])
                 
+                self._profiles_mtime = mtime
+
+                # 文件被修改但选项未变化时不重建 Select（set_options 会清空当前选择）
+                if options == self._profile_options:
+                    return
                 select.set_options(options)
+                self._profile_options = options
 
-                # 设置默认选项：优先使用用户上次选择，其次使用配置中的默认值
+                # 设置默认选项：优先保留当前选择，其次使用用户上次选择，最后使用配置中的默认值
+                current_profile = select.value
                 saved_profile = self._load_user_pref("last_profile")
                 valid_profile_names = [val for _, val in options if not str(val).startswith("__vendor__")]
-                if saved_profile and saved_profile in valid_profile_names:
+                if current_profile in valid_profile_names:
+                    select.value = current_profile
+                elif saved_profile and saved_profile in valid_profile_names:
                     select.value = saved_profile
                 elif self.profile_manager.default_profile_name:
                     select.value = self.profile_manager.default_profile_name
             else:
-                log.write(f"[yellow]Profile 配置文件不存在: {profiles_path}[/yellow]")
+                self._buffer_log(f"[yellow]Profile 配置文件不存在: {profiles_path}[/yellow]")
         except Exception as e:
-            log.write(f"[red]加载 Profile 失败: {e}[/red]")
+            self._buffer_log(f"[red]加载 Profile 失败: {e}[/red]")
+
+    def _prefs(self) -> dict:
+        """获取用户偏好（首次访问时从文件加载，之后使用内存副本）"""
+        if self._user_prefs is None:
+            self._user_prefs = {}
+            try:
+                if self._user_prefs_path.exists():
+                    self._user_prefs = json.loads(self._user_prefs_path.read_text())
+            except Exception:
+                pass
+        return self._user_prefs
 
     def _load_user_pref(self, key: str) -> str | None:
         """加载用户偏好"""
-        try:
-            if self._user_prefs_path.exists():
-                import json
-                prefs = json.loads(self._user_prefs_path.read_text())
-                return prefs.get(key)
-        except Exception:
-            pass
-        return None
+        return self._prefs().get(key)
 
     def _save_user_pref(self, key: str, value: str) -> None:
-        """保存用户偏好"""
-        try:
-            import json
-            self._user_prefs_path.parent.mkdir(parents=True, exist_ok=True)
-            prefs = {}
-            if self._user_prefs_path.exists():
-                prefs = json.loads(self._user_prefs_path.read_text())
-            prefs[key] = value
-            self._user_prefs_path.write_text(json.dumps(prefs, ensure_ascii=False, indent=2))
-        except Exception:
-            pass
+        """保存用户偏好（值未变化时不写文件）"""
+        prefs = self._prefs()
+        if prefs.get(key) == value:
+            return
+        prefs[key] = value
+        # 文件写入放到线程池中，不阻塞界面
+        self._prefs_write = self._executor.submit(self._write_user_prefs)
+
+    def _write_user_prefs(self) -> None:
+        """原子写入用户偏好文件（先写临时文件再替换，中途崩溃不会损坏原文件）"""
+        with self._user_prefs_lock:
+            try:
+                # 写入时取最新的偏好，多次提交时最后完成的一次即为最终状态
+                data = json.dumps(dict(self._user_prefs), ensure_ascii=False, indent=2)
+                path = self._user_prefs_path
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(".json.tmp")
+                tmp_path.write_text(data)
+                os.replace(tmp_path, path)
+            except Exception:
+                pass
 
     @on(Select.Changed, "#profile-select")
     def on_profile_select_changed(self, event: Select.Changed) -> None:
@@ -263,24 +429,43 @@ class PhoneAgentApp(App):
 
     async def _refresh_devices(self) -> None:
         """刷新设备列表"""
-        log = self.query_one("#log-panel", RichLog)
-        device_list = self.query_one("#device-list", ListView)
+        device_list = self._device_list
 
-        log.write("[blue]正在扫描设备...[/blue]")
+        self._buffer_log("[blue]正在扫描设备...[/blue]")
 
         try:
-            devices = self.device_manager.scan_devices()
-            device_list.clear()
+            # adb 扫描为阻塞调用，放到线程池中避免卡住界面
+            loop = asyncio.get_running_loop()
+            devices = await loop.run_in_executor(self._executor, self.device_manager.scan_devices)
+
+            # 只增删变化的设备行，已有设备仅在显示内容变化时更新
+            scanned = {device.device_id: device for device in devices}
+            with self.batch_update():
+                for device_id in [d for d in self._device_items if d not in scanned]:
+                    self._device_items.pop(device_id).remove()
+
+                added = []
+                for device_id, device in scanned.items():
+                    item = self._device_items.get(device_id)
+                    if item is None:
+                        item = self._device_items[device_id] = DeviceListItem(device)
+                        added.append(item)
+                    else:
+                        item.update_device(device)
+                if added:
+                    device_list.extend(added)
+
+            # 已选设备同步为最新的设备信息
+            if self._selected_device and self._selected_device.device_id in scanned:
+                self._selected_device = scanned[self._selected_device.device_id]
 
             if devices:
-                for device in devices:
-                    device_list.append(DeviceListItem(device))
-                log.write(f"[green]发现 {len(devices)} 个设备[/green]")
+                self._buffer_log(f"[green]发现 {len(devices)} 个设备[/green]")
             else:
-                log.write("[yellow]未发现任何设备[/yellow]")
+                self._buffer_log("[yellow]未发现任何设备[/yellow]")
         except Exception as e:
-            log.write(f"[red]设备扫描失败: {e}[/red]")
-            log.write("[dim]请确保 ADB 服务已启动[/dim]")
+            self._buffer_log(f"[red]设备扫描失败: {e}[/red]")
+            self._buffer_log("[dim]请确保 ADB 服务已启动[/dim]")
 
     async def action_refresh_devices(self) -> None:
         """刷新设备动作"""
@@ -288,11 +473,10 @@ class PhoneAgentApp(App):
 
     async def on_list_view_selected(self, event: ListView.Selected) -> None:
         """设备选择事件"""
-        log = self.query_one("#log-panel", RichLog)
 
         if isinstance(event.item, DeviceListItem):
             self._selected_device = event.item.device
-            log.write(f"[green]已选择设备: {self._selected_device.model or self._selected_device.device_id}[/green]")
+            self._buffer_log(f"[green]已选择设备: {self._selected_device.model or self._selected_device.device_id}[/green]")
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """按钮点击事件"""
@@ -320,51 +504,56 @@ class PhoneAgentApp(App):
 
     async def _execute_task(self) -> None:
         """执行任务"""
-        log = self.query_one("#log-panel", RichLog)
-        task_input = self.query_one("#task-input", Input)
-        select = self.query_one("#profile-select", Select)
-        submit_btn = self.query_one("#submit-btn", Button)
-        cancel_btn = self.query_one("#cancel-btn", Button)
+        if self._task_running:
+            self._buffer_log("[yellow]已有任务在执行，请等待完成或取消后再提交[/yellow]")
+            return
+
+        task_input = self._task_input
+        select = self._profile_select
+        submit_btn = self._submit_btn
+        cancel_btn = self._cancel_btn
 
         task = task_input.value.strip()
         if not task:
-            log.write("[yellow]请输入任务描述[/yellow]")
+            self._buffer_log("[yellow]请输入任务描述[/yellow]")
             return
 
         if not self._selected_device:
-            log.write("[yellow]请先选择一个设备[/yellow]")
+            self._buffer_log("[yellow]请先选择一个设备[/yellow]")
             return
 
         profile_name = select.value
         if not profile_name or profile_name == Select.BLANK:
-            log.write("[yellow]请先选择一个 Profile[/yellow]")
+            self._buffer_log("[yellow]请先选择一个 Profile[/yellow]")
             return
 
-        log.write(f"\n[bold cyan]{'='*50}[/bold cyan]")
-        log.write(f"[bold]🎯 任务: {task}[/bold]")
-        log.write(f"📱 设备: {self._selected_device.device_id}")
-        log.write(f"🔧 Profile: {profile_name}")
-        log.write(f"[bold cyan]{'='*50}[/bold cyan]\n")
+        self._buffer_lines([
+            self._TASK_START_HEADER,
+            Text(f"🎯 任务: {task}", style="bold"),
+            Text(f"📱 设备: {self._selected_device.device_id}"),
+            Text(f"🔧 Profile: {profile_name}"),
+            self._TASK_START_FOOTER,
+        ])
 
         task_input.value = ""
 
         # 设置按钮状态
         submit_btn.disabled = True
         cancel_btn.disabled = False
-        pause_btn = self.query_one("#pause-btn", Button)
+        pause_btn = self._pause_btn
         pause_btn.disabled = False
         self._task_running = True
-        
-        # 任务进行时添加取消任务绑定
-        self.bind("escape", "cancel_task", description="取消任务")
-        self.refresh_bindings()
 
         # 记录任务信息
-        import time as time_module
-        self._task_start_time = time_module.time()
+        self._task_start_time = time.monotonic()
         self._current_task_info = {"name": task, "cost": 0.0, "time": 0}
         self._update_task_panel()
 
+        # 任务期间每秒刷新一次面板（耗时/成本/暂停状态），步骤事件不再单独触发重绘
+        if self._panel_timer is not None:
+            self._panel_timer.stop()
+        self._panel_timer = self.set_interval(1.0, self._update_task_panel)
+
         # 使用 Textual 的 worker 在后台执行
         self.run_worker(
             self._run_agent_worker(task, profile_name),
@@ -374,62 +563,53 @@ class PhoneAgentApp(App):
 
     async def _run_agent_worker(self, task: str, profile_name: str) -> None:
         """在后台运行 Agent 任务（worker 版本）"""
-        import queue
-
-        log = self.query_one("#log-panel", RichLog)
 
         # 获取 Profile
         profile = self.profile_manager.get_profile(profile_name)
         if not profile:
-            log.write(f"[red]Profile 不存在: {profile_name}[/red]")
+            self._buffer_log(f"[red]Profile 不存在: {profile_name}[/red]")
             self._reset_buttons()
             return
 
-        log.write(f"[blue]正在初始化...[/blue]")
-
-        # 导入必要模块
-        from phone_agent.adb import ADBDevice
-        from phone_agent.agent import PhoneAgent, AgentConfig, StepResult, ProgressUpdate
-        from phone_agent.prompts import PromptManager
-        from phone_agent.providers import create_vlm_client_from_profile
-        from phone_agent.billing import load_pricing_config
+        self._buffer_log(f"[blue]正在初始化...[/blue]")
 
         # 创建设备控制器
         device = ADBDevice(self._selected_device.device_id)
-        log.write(f"[green]设备已连接[/green]")
+        self._buffer_log(f"[green]设备已连接[/green]")
 
         # 创建 VLM 客户端
         try:
             vlm_client = create_vlm_client_from_profile(profile)
-            log.write(f"[green]VLM 客户端已创建: {profile.vendor}/{profile.model}[/green]")
+            self._buffer_log(f"[green]VLM 客户端已创建: {profile.vendor}/{profile.model}[/green]")
         except Exception as e:
-            log.write(f"[red]创建 VLM 客户端失败: {e}[/red]")
+            self._buffer_log(f"[red]创建 VLM 客户端失败: {e}[/red]")
             self._reset_buttons()
             return
 
-        # 加载 Prompt 管理器（使用项目根目录下的 prompts 文件夹）
-        import os
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        prompts_dir = os.path.join(project_root, "prompts")
-        prompt_manager = PromptManager(prompts_dir)
-        prompt_manager.load()
+        # Prompt 管理器加载后只读，跨任务复用；启动时加载失败则在此重试
+        if self._prompt_manager is None:
+            self._load_prompt_manager()
+        prompt_manager = self._prompt_manager
+        if prompt_manager is None:
+            self._buffer_log("[red]Prompt 未能加载，无法执行任务，请检查 prompts 目录[/red]")
+            self._reset_buttons()
+            return
 
-        # 加载计费管理器
+        # 计费管理器：共享价格表，每个任务独立统计用量
+        if self.settings.billing_enabled and self._billing_template is None:
+            self._load_billing_template()
         billing_manager = None
-        if self.settings.billing_enabled:
-            billing_manager = load_pricing_config(self.settings.billing_config_path)
+        if self._billing_template is not None:
+            billing_manager = self._billing_template.new_session()
+        elif self.settings.billing_enabled:
+            self._buffer_log("[yellow]价格配置未能加载，本次任务不统计费用[/yellow]")
 
-        # 用于线程间通信的队列
-        step_queue = queue.Queue()
-        progress_queue = queue.Queue()
-
-        def on_step(result: StepResult):
-            """步骤完成回调"""
-            step_queue.put(result)
+        # Agent 线程中完成格式化，再通过事件循环写入日志缓冲区，由定时器统一刷新
+        loop = asyncio.get_running_loop()
 
         def on_progress(update: ProgressUpdate):
             """实时进度回调"""
-            progress_queue.put(update)
+            loop.call_soon_threadsafe(self._buffer_lines, self._format_progress(update))
 
         # 创建 Agent 配置
         config = AgentConfig(
@@ -447,139 +627,135 @@ class PhoneAgentApp(App):
             prompt_manager=prompt_manager,
             billing_manager=billing_manager,
             profile=profile,
-            on_step_callback=on_step,
             on_progress_callback=on_progress,
         )
         self._current_agent = agent
 
-        log.write(f"[blue]开始执行任务...[/blue]\n")
+        self._buffer_log(f"[blue]开始执行任务...[/blue]\n")
 
-        # 在线程池中执行同步的 Agent
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-        
-        def run_sync():
-            return agent.run(task)
+        # 在共享线程池中逐步驱动 Agent，每步完成后立即显示
+        steps = agent.iter_steps(task)
+        try:
+            while True:
+                finished, value = await loop.run_in_executor(self._executor, _advance_steps, steps)
+                if finished:
+                    result = value
+                    break
+                # 累计任务面板成本
+                self._current_task_info["cost"] += value.step_cost
+                self._buffer_lines(self._format_step_result(value))
+            
+            lines = [self._TASK_DONE_HEADER, Text(str(result), style="green")]
+            
+            # 显示计费信息
+            if billing_manager:
+                summary = billing_manager.get_task_summary()
+                if summary.step_count > 0:
+                    lines.append(self._COST_SUMMARY_TITLE)
+                    lines.append(Text(f"   输入: {summary.total_prompt_tokens:,} tokens"))
+                    lines.append(Text(f"   输出: {summary.total_completion_tokens:,} tokens"))
+                    lines.append(Text(f"   总成本: ¥{summary.total_cost:.4f}"))
+                    lines.append(Text(f"   步骤数: {summary.step_count}"))
+            
+            lines.append(self._TASK_DONE_FOOTER)
+            self._buffer_lines(lines)
+            
+        except Exception as e:
+            error_msg = self._simplify_error(str(e))
+            self._buffer_log(f"[red]❌ {error_msg}[/red]")
 
-        with ThreadPoolExecutor() as executor:
-            loop = asyncio.get_event_loop()
-            future = loop.run_in_executor(executor, run_sync)
+        self._reset_buttons()
 
-            # 轮询队列更新日志
-            while not future.done():
-                await asyncio.sleep(0.1)
-                
-                # 先处理进度更新（实时显示思考/动作）
-                while not progress_queue.empty():
-                    try:
-                        progress: ProgressUpdate = progress_queue.get_nowait()
-                        self._display_progress(log, progress)
-                    except queue.Empty:
-                        break
-                
-                # 处理队列中的步骤结果
-                while not step_queue.empty():
-                    try:
-                        result: StepResult = step_queue.get_nowait()
-                        self._display_step_result(log, result)
-                    except queue.Empty:
-                        break
+    def _load_task_resources(self) -> None:
+        """加载跨任务复用的 Prompt 管理器和价格配置（各自独立加载，互不影响）"""
+        self._load_prompt_manager()
+        if self.settings.billing_enabled:
+            self._load_billing_template()
 
-            try:
-                result = future.result()
-                
-                # 处理剩余的队列消息
-                while not step_queue.empty():
-                    try:
-                        step_result = step_queue.get_nowait()
-                        self._display_step_result(log, step_result)
-                    except queue.Empty:
-                        break
-                
-                log.write(f"\n[bold green]{'='*50}[/bold green]")
-                log.write(f"[bold green]✅ 任务完成[/bold green]")
-                log.write(f"[green]{result}[/green]")
-                
-                # 显示计费信息
-                if billing_manager:
-                    summary = billing_manager.get_task_summary()
-                    if summary.step_count > 0:
-                        log.write(f"\n[cyan]💰 成本统计:[/cyan]")
-                        log.write(f"   输入: {summary.total_prompt_tokens:,} tokens")
-                        log.write(f"   输出: {summary.total_completion_tokens:,} tokens")
-                        log.write(f"   总成本: ¥{summary.total_cost:.4f}")
-                        log.write(f"   步骤数: {summary.step_count}")
-                
-                log.write(f"[bold green]{'='*50}[/bold green]\n")
-                
-            except Exception as e:
-                error_msg = self._simplify_error(str(e))
-                log.write(f"[red]❌ {error_msg}[/red]")
+    def _load_prompt_manager(self) -> None:
+        """加载 Prompt 管理器，失败时保持为 None"""
+        try:
+            prompt_manager = PromptManager(_PROMPTS_DIR)
+            prompt_manager.load()
+            self._prompt_manager = prompt_manager
+        except Exception as e:
+            self._buffer_log(f"[red]加载 Prompt 失败: {e}[/red]")
 
-        self._reset_buttons()
+    def _load_billing_template(self) -> None:
+        """加载价格配置，失败时保持为 None"""
+        try:
+            self._billing_template = load_pricing_config(self.settings.billing_config_path)
+        except Exception as e:
+            self._buffer_log(f"[red]加载价格配置失败: {e}[/red]")
 
     def _simplify_error(self, error: str) -> str:
         """将错误信息简化为友好提示"""
-        error_lower = error.lower()
-        
-        # 常见错误映射
-        if "model do not support image input" in error_lower or "image input" in error_lower:
-            return "错误：当前模型不支持图片输入，请切换到视觉模型（如 doubao-vision）"
-        elif "api key" in error_lower or "authentication" in error_lower or "unauthorized" in error_lower:
-            return "错误：API Key 无效或未配置，请在设置中检查 API Key"
-        elif "rate limit" in error_lower:
-            return "错误：请求过于频繁，已触发限流，请稍后再试"
-        elif "timeout" in error_lower:
-            return "错误：请求超时，请检查网络连接"
-        elif "connection" in error_lower:
-            return "错误：网络连接失败，请检查网络"
-        elif "quota" in error_lower or "insufficient" in error_lower:
-            return "错误：账户余额不足或配额已用完"
-        elif "invalid" in error_lower and "model" in error_lower:
-            return "错误：模型名称无效，请检查 Profile 配置"
-        elif "base_url" in error_lower or "endpoint" in error_lower:
-            return "错误：API 地址无效，请检查 Profile 中的 Base URL 配置"
-        else:
-            # 截取错误消息的关键部分
-            if len(error) > 100:
-                return f"错误：{error[:100]}..."
-            return f"错误：{error}"
+        for pattern, message in _ERROR_PATTERNS:
+            if pattern.search(error):
+                return message
 
-    def _display_step_result(self, log: RichLog, result) -> None:
-        """显示步骤结果（成本和完成标记）"""
+        # 截取错误消息的关键部分
+        if len(error) > 100:
+            return f"错误：{error[:100]}..."
+        return f"错误：{error}"
+
+    def _format_step_result(self, result: StepResult) -> list[Text]:
+        """格式化步骤结果（成本和完成标记），不修改界面状态"""
         # 进度已通过 on_progress_callback 实时显示，这里只显示完成状态和成本
         status = "✅" if result.success else "❌"
-        log.write(f"[dim]━━━ 步骤完成 {status} ━━━[/dim]")
+        lines = [Text(self._STEP_DONE_FMT.format(result.step_index, status), style="dim")]
 
         if result.step_cost > 0:
-            log.write(f"[dim]💰 成本: ¥{result.step_cost:.4f}[/dim]")
-            # 更新任务面板成本
-            self._current_task_info["cost"] += result.step_cost
-            self._update_task_panel()
-
-    def _display_progress(self, log: RichLog, progress) -> None:
-        """显示实时进度（思考/动作/等待）"""
+            lines.append(Text(self._STEP_COST_FMT.format(result.step_cost), style="dim"))
+
+        return lines
+
+    def _buffer_log(self, line: str | Text) -> None:
+        """写入日志缓冲区（字符串按 markup 解析，与 RichLog.write 一致）"""
+        if isinstance(line, str):
+            line = self._log.highlighter(Text.from_markup(line))
+        self._log_buffer.append(line)
+        self._schedule_log_flush()
+
+    def _buffer_lines(self, lines: list[Text]) -> None:
+        """批量写入日志缓冲区"""
+        self._log_buffer.extend(lines)
+        self._schedule_log_flush()
+
+    def _schedule_log_flush(self) -> None:
+        """缓冲区有内容且尚未安排刷新时，约 1/30 秒后刷新一次（空闲时不唤醒事件循环）"""
+        if self._log_flush_timer is None and self._log_buffer:
+            self._log_flush_timer = self.set_timer(1 / 30, self._flush_log)
+
+    def _flush_log(self) -> None:
+        """定时器回调：将缓冲的日志合并为一次 RichLog 写入"""
+        self._log_flush_timer = None
+        if self._log_buffer:
+            lines, self._log_buffer = self._log_buffer, []
+            self._log.write(self._NEWLINE.join(lines))
+
+    def _format_progress(self, progress: ProgressUpdate) -> list[Text]:
+        """格式化实时进度（思考/动作/等待），纯函数，可在 Agent 线程中调用"""
+        lines: list[Text] = []
         if progress.phase == "thinking":
             # 显示步骤头和思考
-            log.write(f"\n[bold cyan]━━━ 步骤 {progress.step} ━━━[/bold cyan]")
+            lines.append(Text(self._STEP_HEADER_FMT.format(progress.step), style="bold cyan"))
             if progress.thinking:
-                thinking_preview = progress.thinking[:200]
-                if len(progress.thinking) > 200:
-                    thinking_preview += "..."
-                log.write(f"[yellow]💭 思考:[/yellow] {thinking_preview}")
+                lines.append(Text.assemble(self._THINKING_PREFIX, _truncate(progress.thinking, 200)))
             if progress.action:
-                log.write(f"[blue]🎬 动作:[/blue] {progress.action[:100]}...")
+                lines.append(Text.assemble(self._ACTION_PREFIX, _truncate(progress.action, 100)))
         elif progress.phase == "action":
             if progress.message:
-                log.write(f"[green]📝 结果:[/green] {progress.message}")
+                lines.append(Text.assemble(self._RESULT_PREFIX, progress.message))
         elif progress.phase == "waiting":
-            log.write(f"[dim]⏳ {progress.message}[/dim]")
+            lines.append(Text(self._WAITING_FMT.format(progress.message), style="dim"))
+        return lines
 
     def _reset_buttons(self) -> None:
         """重置按钮状态"""
-        submit_btn = self.query_one("#submit-btn", Button)
-        cancel_btn = self.query_one("#cancel-btn", Button)
-        pause_btn = self.query_one("#pause-btn", Button)
+        submit_btn = self._submit_btn
+        cancel_btn = self._cancel_btn
+        pause_btn = self._pause_btn
         submit_btn.disabled = False
         cancel_btn.disabled = True
         pause_btn.disabled = True
@@ -595,53 +771,50 @@ class PhoneAgentApp(App):
         self._task_running = False
         self._current_agent = None
         self._current_task_info = {"name": "", "cost": 0.0, "time": 0}
+        if self._panel_timer is not None:
+            self._panel_timer.stop()
+            self._panel_timer = None
         self._update_task_panel()
-        
-        # 移除取消任务绑定
-        try:
-            # 移除动态绑定的 escape
-            self._bindings.key_to_bindings.pop("escape", None)
-            self.refresh_bindings()
-        except Exception:
-            pass
 
     async def action_cancel_task(self) -> None:
         """取消当前任务"""
         if self._current_agent and self._task_running:
-            log = self.query_one("#log-panel", RichLog)
-            log.write("[yellow]⏹️ 正在取消任务...[/yellow]")
+            self._buffer_log("[yellow]⏹️ 正在取消任务...[/yellow]")
             self._current_agent.cancel()
             
             # 立即重置 UI 状态，不等待后台任务完成
             self._reset_buttons()
-            log.write("[yellow]任务已取消（后台请求可能仍在完成中）[/yellow]")
+            self._buffer_log("[yellow]任务已取消（后台请求可能仍在完成中）[/yellow]")
 
     async def action_toggle_pause(self) -> None:
         """暂停/恢复任务"""
         if not self._current_agent or not self._task_running:
             return
         
-        log = self.query_one("#log-panel", RichLog)
-        pause_btn = self.query_one("#pause-btn", Button)
+        pause_btn = self._pause_btn
         
         if self._current_agent.is_paused():
             self._current_agent.resume()
             pause_btn.label = "暂停"
-            log.write("[green]▶️ 任务已恢复[/green]")
+            self._buffer_log("[green]▶️ 任务已恢复[/green]")
         else:
             self._current_agent.pause()
             pause_btn.label = "继续"
-            log.write("[yellow]⏸️ 任务已暂停 - 可手动操作手机，完成后点击「继续」[/yellow]")
+            self._buffer_log("[yellow]⏸️ 任务已暂停 - 可手动操作手机，完成后点击「继续」[/yellow]")
 
     async def action_open_settings(self) -> None:
         """打开设置界面"""
-        from phone_agent.tui.screens.settings import SettingsScreen
-        self.push_screen(SettingsScreen())
+        # 设置界面关闭后重新加载 Profile（配置可能已被修改）
+        self.push_screen(SettingsScreen(), callback=self._on_settings_closed)
+
+    async def _on_settings_closed(self, _result: None) -> None:
+        """设置界面关闭回调"""
+        await self._load_profiles()
 
     def _update_task_panel_buttons(self) -> None:
         """更新任务面板按钮样式"""
-        current_btn = self.query_one("#show-current-btn", Button)
-        history_btn = self.query_one("#show-history-btn", Button)
+        current_btn = self._show_current_btn
+        history_btn = self._show_history_btn
         
         if self._show_current_task:
             current_btn.variant = "primary"
@@ -652,13 +825,12 @@ class PhoneAgentApp(App):
 
     def _update_task_panel(self) -> None:
         """更新任务面板内容"""
-        content = self.query_one("#task-status-content", Static)
+        content = self._task_status_content
         
         if self._show_current_task:
             # 显示当前任务
             if self._task_running and self._current_task_info["name"]:
-                import time as time_module
-                elapsed = int(time_module.time() - self._task_start_time)
+                elapsed = int(time.monotonic() - self._task_start_time)
                 mins, secs = divmod(elapsed, 60)
                 
                 status = "⏸️ 暂停" if (self._current_agent and self._current_agent.is_paused()) else "▶️ 执行中"
@@ -673,7 +845,8 @@ class PhoneAgentApp(App):
             # 显示历史任务
             if self._task_history:
                 lines = []
-                for i, task in enumerate(self._task_history[-5:]):  # 最近5个
+                recent = islice(self._task_history, max(len(self._task_history) - 5, 0), None)
+                for i, task in enumerate(recent):  # 最近5个
                     lines.append(f"{i+1}. {task['name'][:15]}.. ¥{task['cost']:.4f}")
                 text = "\n".join(lines)
             else:
@@ -682,13 +855,46 @@ class PhoneAgentApp(App):
         content.update(text)
 
 
+def _install_fast_event_loop() -> None:
+    """安装 uvloop（Windows 上为 winloop）事件循环，未安装时使用默认循环"""
+    try:
+        if sys.platform == "win32":
+            import winloop as fast_loop
+        else:
+            import uvloop as fast_loop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(fast_loop.EventLoopPolicy())
+
+
+def _start_profiling(output: str = "phone_agent.prof") -> None:
+    """启动 yappi 墙钟计时（可统计协程耗时），退出时写出 callgrind 文件"""
+    try:
+        import yappi
+    except ImportError:
+        print("⚠️ 未安装 yappi，已跳过性能分析 (pip install yappi)")
+        return
+
+    def dump() -> None:
+        yappi.stop()
+        yappi.get_func_stats().save(output, type="callgrind")
+        print(f"📊 性能分析结果已写入: {output}")
+
+    yappi.set_clock_type("wall")
+    yappi.start()
+    atexit.register(dump)
+
+
 def main() -> None:
     """TUI 入口点"""
-    from dotenv import load_dotenv
-
     # 加载环境变量
     load_dotenv()
 
+    _install_fast_event_loop()
+
+    if os.getenv("PHONE_AGENT_PROFILING"):
+        _start_profiling()
+
     app = PhoneAgentApp()
     app.run()
 
@@ -2,9 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import os
+import re
+import shutil
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
+import yaml
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Container, Horizontal, Vertical, VerticalScroll
@@ -23,6 +30,181 @@ from textual.widgets import (
     TabPane,
 )
 
+from phone_agent.config import ProfileManager, get_settings
+
+# 优先使用 libyaml 的 C 实现（PyYAML 未编译 libyaml 时回退到纯 Python 版本）
+try:
+    from yaml import CSafeDumper as _YamlDumper
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+    from yaml import SafeLoader as _YamlLoader
+
+
+@lru_cache(maxsize=4)
+def _load_profile_manager(path: str, mtime_ns: int) -> ProfileManager:
+    """解析 profiles.yaml（按路径和修改时间缓存，文件未变化时不重复解析）"""
+    manager = ProfileManager()
+    manager.load_from_yaml(Path(path))
+    return manager
+
+
+def _get_profile_manager(profiles_path: Path) -> ProfileManager:
+    """获取 profiles.yaml 对应的 ProfileManager（只读使用）"""
+    return _load_profile_manager(str(profiles_path), profiles_path.stat().st_mtime_ns)
+
+
+# .env 中的 API Key 名称 -> 对应输入框 id
+_API_KEY_INPUTS = {
+    "VOLCANO_API_KEY": "input-volcano-key",
+    "OPENAI_API_KEY": "input-openai-key",
+    "DEEPSEEK_API_KEY": "input-deepseek-key",
+    "ANTHROPIC_API_KEY": "input-anthropic-key",
+    "GOOGLE_API_KEY": "input-google-key",
+    "MODELSCOPE_API_KEY": "input-modelscope-key",
+}
+_API_KEY_NAMES = frozenset(_API_KEY_INPUTS)
+
+
+def _atomic_write_bytes(path: Path, data: bytes | bytearray) -> None:
+    """
+    原子写入文件（先写临时文件再替换，中途崩溃不会损坏原文件）
+
+    写入符号链接指向的真实文件，并保留原文件的权限（如 .env 的 0600）
+    """
+    target = path.resolve()
+    tmp_path = target.with_name(target.name + ".tmp")
+    tmp_path.write_bytes(data)
+    if target.exists():
+        shutil.copymode(target, tmp_path)
+    os.replace(tmp_path, target)
+
+
+# .env 赋值行：可选的注释前缀 + 键名 + "="
+_ENV_KEY_RE = re.compile(rb"[ \t]*(#[ \t]*)?([A-Za-z_][A-Za-z0-9_]*)=")
+
+
+def _rewrite_env_sync(
+    env_path: Path,
+    mapping: dict[str, str],
+    commented_keys: frozenset[str] = frozenset(),
+) -> None:
+    """
+    按 mapping 更新 .env 中的键值（阻塞 IO，需在线程中调用）
+
+    Args:
+        env_path: .env 文件路径
+        mapping: 键 -> 新值，空值表示删除该行
+        commented_keys: 被注释为 "# KEY=" 时也会被替换的键
+    """
+    # 按字节读取和匹配，保留的行原样写回，无需解码/编码（splitlines 同样兼容 CRLF）
+    raw = env_path.read_bytes() if env_path.exists() else b""
+    
+    # 尚未写入的非空键值，匹配到后弹出，剩余的追加到文件末尾
+    pending = {key: value for key, value in mapping.items() if value}
+    # 直接拼接到一个字节缓冲区，最后一次写入
+    buf = bytearray()
+    
+    # 每行用一次预编译正则提取键名，再按键名做字典查找
+    for line in raw.splitlines():
+        match = _ENV_KEY_RE.match(line)
+        key = match.group(2).decode("ascii") if match else None
+        if key not in mapping or (match.group(1) and key not in commented_keys):
+            buf += line
+            buf += b"\n"
+            continue
+        
+        # 空值或重复出现的键：删除该行
+        value = pending.pop(key, None)
+        if value:
+            buf += f"{key}={value}\n".encode("utf-8")
+    
+    for key, value in pending.items():
+        buf += f"{key}={value}\n".encode("utf-8")
+    
+    _atomic_write_bytes(env_path, buf)
+
+
+def _read_profiles_sync(profiles_path: Path) -> dict[str, Any]:
+    """读取 profiles.yaml（阻塞 IO，需在线程中调用）"""
+    if not profiles_path.exists():
+        return {"profiles": {}}
+    with open(profiles_path) as f:
+        return yaml.load(f, Loader=_YamlLoader) or {"profiles": {}}
+
+
+# JSON 双引号字符串即合法的 YAML 双引号标量（C0 控制字符会被转义），但以下字符
+# 会被 YAML 当作换行/BOM，或是 PyYAML 拒绝读取的不可打印字符（DEL、C1 控制字符、代理项等）
+_YAML_UNSAFE_CHARS_RE = re.compile("[\x7f-\x9f\u2028\u2029\ud800-\udfff\ufeff\ufffe\uffff]")
+# 可以不加引号输出的标识符（排除 YAML 1.1 中会被解析为布尔/null 的单词）
+_YAML_PLAIN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_-]*")
+_YAML_RESERVED_WORDS = frozenset({"y", "n", "yes", "no", "on", "off", "true", "false", "null"})
+
+
+def _yaml_scalar(value: Any) -> str | None:
+    """将标量转换为 YAML 文本，不支持的类型返回 None"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, str):
+        if _YAML_PLAIN_RE.fullmatch(value) and value.lower() not in _YAML_RESERVED_WORDS:
+            return value
+        if not _YAML_UNSAFE_CHARS_RE.search(value):
+            return json.dumps(value, ensure_ascii=False)
+    return None
+
+
+def _emit_yaml_mapping(mapping: dict[Any, Any], indent: str, lines: list[str]) -> bool:
+    """按块格式输出嵌套字典（键排序与 yaml.dump 一致），遇到不支持的结构返回 False"""
+    if not all(isinstance(key, str) for key in mapping):
+        return False
+    for key in sorted(mapping):
+        value = mapping[key]
+        key_text = _yaml_scalar(key)
+        if key_text is None:
+            return False
+        if isinstance(value, dict):
+            if not value:
+                lines.append(f"{indent}{key_text}: {{}}")
+            else:
+                lines.append(f"{indent}{key_text}:")
+                if not _emit_yaml_mapping(value, indent + "  ", lines):
+                    return False
+            continue
+        value_text = _yaml_scalar(value)
+        if value_text is None:
+            return False
+        lines.append(f"{indent}{key_text}: {value_text}")
+    return True
+
+
+def _emit_profiles_yaml(data: dict[str, Any]) -> str | None:
+    """
+    直接输出 profiles.yaml 文本，跳过 PyYAML 通用的 representer 流程
+
+    profiles.yaml 只由嵌套字典和字符串/布尔/整数/null 标量组成；
+    包含列表、浮点数等其他结构时返回 None，由 yaml.dump 处理
+    """
+    lines: list[str] = []
+    if not _emit_yaml_mapping(data, "", lines):
+        return None
+    return "\n".join(lines) + "\n"
+
+
+def _write_profiles_sync(profiles_path: Path, data: dict[str, Any]) -> None:
+    """写入 profiles.yaml（阻塞 IO，需在线程中调用）"""
+    text = _emit_profiles_yaml(data)
+    if text is None:
+        try:
+            text = yaml.dump(data, Dumper=_YamlDumper, allow_unicode=True, default_flow_style=False)
+        except UnicodeEncodeError as e:
+            # 孤立代理项无法以 UTF-8 写入，拒绝保存而不是写出无法读取的文件
+            raise ValueError(f"配置中包含无法写入 YAML 的字符: {e.object[e.start:e.end]!r}") from e
+    _atomic_write_bytes(profiles_path, text.encode("utf-8"))
+
 
 class SettingsScreen(Screen):
     """设置界面（全屏）"""
@@ -33,6 +215,20 @@ class SettingsScreen(Screen):
         Binding("q", "quit_app", "退出"),
     ]
 
+    # Profile 表单中供应商/协议选择框的固定选项
+    _VENDOR_OPTIONS = (
+        ("火山方舟", "火山方舟"),
+        ("OpenAI", "OpenAI"),
+        ("DeepSeek", "DeepSeek"),
+        ("Anthropic", "Anthropic"),
+        ("Google", "Google"),
+    )
+    _PROTOCOL_OPTIONS = (
+        ("openai", "openai"),
+        ("anthropic", "anthropic"),
+        ("gemini", "gemini"),
+    )
+
     CSS = """
     SettingsScreen {
         layout: vertical;
@@ -113,6 +309,16 @@ class SettingsScreen(Screen):
     def __init__(self) -> None:
         super().__init__()
         self._selected_profile: str | None = None
+        # 表单控件缓存（on_mount 时按 id 解析一次）
+        self._widgets: dict[str, Input] = {}
+        self._selects: dict[str, Select] = {}
+        self._profile_list: ListView | None = None  # Profiles 页构建后才有值
+        self._profile_names: tuple[str, ...] | None = None  # 上次加载的 Profile 名称
+        # 上次加载/保存时的 Profile 表单内容，未修改时跳过保存
+        self._profile_snapshot: tuple[str, tuple[tuple[str, Any], ...]] | None = None
+        # 保存合并：保存进行中时只记录有新的保存请求
+        self._save_task: asyncio.Task[None] | None = None
+        self._save_pending = False
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -147,60 +353,9 @@ class SettingsScreen(Screen):
                         yield Static("ModelScope:", classes="form-label")
                         yield Input(placeholder="MODELSCOPE_API_KEY", id="input-modelscope-key", password=True, classes="form-input")
 
-                # Profiles Tab
+                # Profiles Tab（首次切换到该页时才构建，见 _build_profiles_tab）
                 with TabPane("📋 Profiles", id="tab-profiles"):
-                    with VerticalScroll():
-                        yield Static("模型配置列表：", classes="section-title")
-                        yield ListView(id="profile-list")
-                        
-                        with Horizontal(id="profile-buttons"):
-                            yield Button("新增", id="btn-add-profile", variant="success")
-                            yield Button("编辑", id="btn-edit-profile", variant="primary")
-                            yield Button("删除", id="btn-delete-profile", variant="error")
-                        
-                        yield Static("Profile 详情：", classes="section-title")
-                        
-                        with Horizontal(classes="form-row"):
-                            yield Static("名称:", classes="form-label")
-                            yield Input(id="profile-name", classes="form-input")
-                        
-                        with Horizontal(classes="form-row"):
-                            yield Static("供应商:", classes="form-label")
-                            yield Select(
-                                options=[
-                                    ("火山方舟", "火山方舟"),
-                                    ("OpenAI", "OpenAI"),
-                                    ("DeepSeek", "DeepSeek"),
-                                    ("Anthropic", "Anthropic"),
-                                    ("Google", "Google"),
-                                ],
-                                id="profile-vendor",
-                                classes="form-input",
-                            )
-                        
-                        with Horizontal(classes="form-row"):
-                            yield Static("协议:", classes="form-label")
-                            yield Select(
-                                options=[
-                                    ("openai", "openai"),
-                                    ("anthropic", "anthropic"),
-                                    ("gemini", "gemini"),
-                                ],
-                                id="profile-protocol",
-                                classes="form-input",
-                            )
-                        
-                        with Horizontal(classes="form-row"):
-                            yield Static("模型:", classes="form-label")
-                            yield Input(id="profile-model", classes="form-input")
-                        
-                        with Horizontal(classes="form-row"):
-                            yield Static("Base URL:", classes="form-label")
-                            yield Input(id="profile-base-url", classes="form-input")
-                        
-                        with Horizontal(classes="form-row"):
-                            yield Static("API Key:", classes="form-label")
-                            yield Input(id="profile-api-key", placeholder="留空使用环境变量", classes="form-input")
+                    yield Static("加载中...")
 
                 # Basic Settings Tab
                 with TabPane("⚙️ 基本设置", id="tab-settings"):
@@ -229,79 +384,139 @@ class SettingsScreen(Screen):
         
         yield Footer()
 
+    def _build_profiles_tab(self) -> VerticalScroll:
+        """构建 Profiles 页的控件树"""
+        return VerticalScroll(
+            Static("模型配置列表：", classes="section-title"),
+            ListView(id="profile-list"),
+            Horizontal(
+                Button("新增", id="btn-add-profile", variant="success"),
+                Button("编辑", id="btn-edit-profile", variant="primary"),
+                Button("删除", id="btn-delete-profile", variant="error"),
+                id="profile-buttons",
+            ),
+            Static("Profile 详情：", classes="section-title"),
+            Horizontal(
+                Static("名称:", classes="form-label"),
+                Input(id="profile-name", classes="form-input"),
+                classes="form-row",
+            ),
+            Horizontal(
+                Static("供应商:", classes="form-label"),
+                Select(options=self._VENDOR_OPTIONS, id="profile-vendor", classes="form-input"),
+                classes="form-row",
+            ),
+            Horizontal(
+                Static("协议:", classes="form-label"),
+                Select(options=self._PROTOCOL_OPTIONS, id="profile-protocol", classes="form-input"),
+                classes="form-row",
+            ),
+            Horizontal(
+                Static("模型:", classes="form-label"),
+                Input(id="profile-model", classes="form-input"),
+                classes="form-row",
+            ),
+            Horizontal(
+                Static("Base URL:", classes="form-label"),
+                Input(id="profile-base-url", classes="form-input"),
+                classes="form-row",
+            ),
+            Horizontal(
+                Static("API Key:", classes="form-label"),
+                Input(id="profile-api-key", placeholder="留空使用环境变量", classes="form-input"),
+                classes="form-row",
+            ),
+        )
+
+    async def on_tabbed_content_tab_activated(self, event: TabbedContent.TabActivated) -> None:
+        """首次切换到 Profiles 页时构建控件并填充列表"""
+        pane = event.pane
+        if pane.id != "tab-profiles" or self._profile_list is not None:
+            return
+        
+        content = self._build_profiles_tab()
+        with self.app.batch_update():
+            await pane.remove_children()
+            await pane.mount(content)
+        
+        self._widgets.update({widget.id: widget for widget in content.query(Input) if widget.id})
+        self._selects.update({widget.id: widget for widget in content.query(Select) if widget.id})
+        self._profile_list = content.query_one("#profile-list", ListView)
+        await self._fill_profile_list()
+
     async def on_mount(self) -> None:
         """加载现有配置"""
+        self._widgets = {widget.id: widget for widget in self.query(Input) if widget.id}
+        self._selects = {widget.id: widget for widget in self.query(Select) if widget.id}
+        
         await self._load_api_keys()
         await self._load_profiles()
         await self._load_settings()
 
     async def _load_api_keys(self) -> None:
         """从环境变量加载 API Keys"""
-        key_mapping = {
-            "input-volcano-key": "VOLCANO_API_KEY",
-            "input-openai-key": "OPENAI_API_KEY",
-            "input-deepseek-key": "DEEPSEEK_API_KEY",
-            "input-anthropic-key": "ANTHROPIC_API_KEY",
-            "input-google-key": "GOOGLE_API_KEY",
-            "input-modelscope-key": "MODELSCOPE_API_KEY",
-        }
-        
-        for input_id, env_key in key_mapping.items():
-            value = os.getenv(env_key, "")
-            if value:
-                try:
-                    input_widget = self.query_one(f"#{input_id}", Input)
-                    input_widget.value = value
-                except Exception:
-                    pass
+        env = os.environ
+        for env_key, input_id in _API_KEY_INPUTS.items():
+            value = env.get(env_key)
+            if not value:
+                continue
+            self._widgets[input_id].value = value
 
     async def _load_profiles(self) -> None:
         """加载 Profile 列表"""
         try:
-            from pathlib import Path
-            from phone_agent.config import ProfileManager
-            from phone_agent.config import get_settings
-            
             settings = get_settings()
-            manager = ProfileManager()
             
             # 需要先加载 YAML 文件
             profiles_path = Path(settings.profiles_config_path)
-            if profiles_path.exists():
-                manager.load_from_yaml(profiles_path)
-            else:
+            if not profiles_path.exists():
                 self.notify(f"配置文件不存在: {profiles_path}", severity="warning")
                 return
+            manager = _get_profile_manager(profiles_path)
             
-            profile_list = self.query_one("#profile-list", ListView)
-            profile_list.clear()
-            
-            profiles = manager.list_profiles()
+            profiles = tuple(manager.list_profiles())
             self.log(f"加载到 {len(profiles)} 个 profiles")
             
-            for name in profiles:
-                profile_list.append(ListItem(Static(name), id=f"profile-{name}"))
+            # Profile 名称未变化时跳过列表和选择框的重建
+            if profiles == self._profile_names:
+                return
+            self._profile_names = profiles
             
-            # 更新默认 Profile 选择框
-            default_select = self.query_one("#setting-default-profile", Select)
-            options = [(name, name) for name in profiles]
-            default_select.set_options(options)
+            with self.app.batch_update():
+                await self._fill_profile_list()
+                
+                # 更新默认 Profile 选择框（set_options 会清空当前选择，仍有效时恢复）
+                default_select = self._selects["setting-default-profile"]
+                selected = default_select.value
+                default_select.set_options([(name, name) for name in profiles])
+                if selected in profiles:
+                    default_select.value = selected
             
         except Exception as e:
             self.log(f"加载 Profile 失败: {e}")
             self.notify(f"加载 Profile 失败: {e}", severity="error")
 
+    async def _fill_profile_list(self) -> None:
+        """用已加载的 Profile 名称重建列表（Profiles 页尚未构建时跳过）"""
+        if self._profile_list is None or self._profile_names is None:
+            return
+        
+        # 先构建全部列表项，再一次性挂载
+        items = [ListItem(Static(name), id=f"profile-{name}") for name in self._profile_names]
+        with self.app.batch_update():
+            await self._profile_list.clear()
+            await self._profile_list.extend(items)
+
     async def _load_settings(self) -> None:
         """加载基本设置"""
         try:
-            from phone_agent.config import get_settings
             settings = get_settings()
             
-            self.query_one("#setting-max-steps", Input).value = str(settings.max_steps)
-            self.query_one("#setting-action-delay", Input).value = str(settings.action_delay)
-            self.query_one("#setting-summarize-interval", Input).value = str(settings.summarize_interval)
+            self._widgets["setting-max-steps"].value = str(settings.max_steps)
+            self._widgets["setting-action-delay"].value = str(settings.action_delay)
+            self._widgets["setting-summarize-interval"].value = str(settings.summarize_interval)
             
-            default_select = self.query_one("#setting-default-profile", Select)
+            default_select = self._selects["setting-default-profile"]
             if settings.default_profile:
                 default_select.value = settings.default_profile
             
@@ -311,11 +526,11 @@ class SettingsScreen(Screen):
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """按钮点击事件"""
         if event.button.id == "btn-save":
-            await self._save_all()
+            self._request_save()
         elif event.button.id == "btn-back":
-            self.app.pop_screen()
+            await self.action_go_back()
         elif event.button.id == "btn-quit":
-            self.app.exit()
+            await self.action_quit_app()
         elif event.button.id == "btn-add-profile":
             self._clear_profile_form()
             self._selected_profile = None
@@ -334,10 +549,25 @@ class SettingsScreen(Screen):
 
     def _clear_profile_form(self) -> None:
         """清空 Profile 表单"""
-        self.query_one("#profile-name", Input).value = ""
-        self.query_one("#profile-model", Input).value = ""
-        self.query_one("#profile-base-url", Input).value = ""
-        self.query_one("#profile-api-key", Input).value = ""
+        self._widgets["profile-name"].value = ""
+        self._widgets["profile-model"].value = ""
+        self._widgets["profile-base-url"].value = ""
+        self._widgets["profile-api-key"].value = ""
+        self._profile_snapshot = None
+
+    def _collect_profile_form(self) -> tuple[str, dict[str, Any]]:
+        """读取 Profile 表单，返回 (名称, 写入 YAML 的配置)"""
+        vendor_select = self._selects["profile-vendor"]
+        protocol_select = self._selects["profile-protocol"]
+        
+        profile_data = {
+            "vendor": "OpenAI" if vendor_select.is_blank() else vendor_select.value,
+            "protocol": "openai" if protocol_select.is_blank() else protocol_select.value,
+            "model": self._widgets["profile-model"].value,
+            "base_url": self._widgets["profile-base-url"].value or None,
+            "api_key": self._widgets["profile-api-key"].value or None,
+        }
+        return self._widgets["profile-name"].value.strip(), profile_data
 
     async def _load_selected_profile(self) -> None:
         """加载选中的 Profile 到表单"""
@@ -346,27 +576,26 @@ class SettingsScreen(Screen):
             return
         
         try:
-            from pathlib import Path
-            from phone_agent.config import ProfileManager, get_settings
-            
             settings = get_settings()
-            manager = ProfileManager()
-            manager.load_from_yaml(Path(settings.profiles_config_path))
+            manager = _get_profile_manager(Path(settings.profiles_config_path))
             
             profile = manager.get_profile(self._selected_profile)
             
             if profile:
-                self.query_one("#profile-name", Input).value = self._selected_profile
-                self.query_one("#profile-model", Input).value = profile.model
-                self.query_one("#profile-base-url", Input).value = profile.base_url or ""
-                self.query_one("#profile-api-key", Input).value = profile.api_key or ""
+                self._widgets["profile-name"].value = self._selected_profile
+                self._widgets["profile-model"].value = profile.model
+                self._widgets["profile-base-url"].value = profile.base_url or ""
+                self._widgets["profile-api-key"].value = profile.api_key or ""
                 
-                vendor_select = self.query_one("#profile-vendor", Select)
+                vendor_select = self._selects["profile-vendor"]
                 vendor_select.value = profile.vendor
                 
-                protocol_select = self.query_one("#profile-protocol", Select)
+                protocol_select = self._selects["profile-protocol"]
                 protocol_select.value = profile.protocol
                 
+                name, profile_data = self._collect_profile_form()
+                self._profile_snapshot = (name, tuple(profile_data.items()))
+                
                 self.notify(f"已加载: {self._selected_profile}")
                 
         except Exception as e:
@@ -380,138 +609,93 @@ class SettingsScreen(Screen):
         
         self.notify(f"删除功能待实现: {self._selected_profile}", severity="warning")
 
+    def _request_save(self) -> None:
+        """请求保存（保存进行中时再次请求只会合并为一次后续保存）"""
+        if self._save_task is not None and not self._save_task.done():
+            self._save_pending = True
+            return
+        # 保存在独立任务中进行，处理函数立即返回，后续按键才能在保存期间被合并
+        self._save_task = asyncio.create_task(self._save_loop())
+
+    async def _save_loop(self) -> None:
+        """执行保存，期间累积的保存请求合并为一次（保存最新的表单内容）"""
+        while True:
+            self._save_pending = False
+            await self._save_all()
+            if not self._save_pending:
+                break
+
+    async def _wait_for_save(self) -> None:
+        """等待进行中的保存完成（离开界面前调用，避免中断写入）"""
+        if self._save_task is not None and not self._save_task.done():
+            self.notify("正在保存，请稍候")
+            await self._save_task
+
     async def _save_all(self) -> None:
         """保存所有配置"""
         try:
-            await self._save_api_keys()
+            await self._save_env(self._collect_env_mapping())
             await self._save_profile_form()
-            await self._save_settings()
+            await self._load_profiles()
             self.notify("✅ 配置已保存", severity="information")
         except Exception as e:
             self.notify(f"保存失败: {e}", severity="error")
 
-    async def _save_api_keys(self) -> None:
-        """保存 API Keys 到 .env"""
-        env_path = Path(".env")
+    def _collect_env_mapping(self) -> dict[str, str]:
+        """收集 API Keys 和基本设置表单中需要写入 .env 的键值"""
+        default_profile_select = self._selects["setting-default-profile"]
         
-        existing_lines = []
-        if env_path.exists():
-            existing_lines = env_path.read_text().splitlines()
-        
-        key_mapping = {
-            "VOLCANO_API_KEY": self.query_one("#input-volcano-key", Input).value,
-            "OPENAI_API_KEY": self.query_one("#input-openai-key", Input).value,
-            "DEEPSEEK_API_KEY": self.query_one("#input-deepseek-key", Input).value,
-            "ANTHROPIC_API_KEY": self.query_one("#input-anthropic-key", Input).value,
-            "GOOGLE_API_KEY": self.query_one("#input-google-key", Input).value,
-            "MODELSCOPE_API_KEY": self.query_one("#input-modelscope-key", Input).value,
+        mapping = {
+            env_key: self._widgets[input_id].value
+            for env_key, input_id in _API_KEY_INPUTS.items()
         }
-        
-        updated_keys = set()
-        new_lines = []
-        
-        for line in existing_lines:
-            updated = False
-            for key, value in key_mapping.items():
-                if line.startswith(f"{key}=") or line.startswith(f"# {key}="):
-                    if value:
-                        new_lines.append(f"{key}={value}")
-                        updated_keys.add(key)
-                    updated = True
-                    break
-            
-            if not updated:
-                new_lines.append(line)
-        
-        for key, value in key_mapping.items():
-            if key not in updated_keys and value:
-                new_lines.append(f"{key}={value}")
-        
-        env_path.write_text("\n".join(new_lines) + "\n")
+        mapping.update({
+            "PHONE_AGENT_DEFAULT_PROFILE": "" if default_profile_select.is_blank() else default_profile_select.value,
+            "PHONE_AGENT_MAX_STEPS": self._widgets["setting-max-steps"].value,
+            "PHONE_AGENT_ACTION_DELAY": self._widgets["setting-action-delay"].value,
+            "PHONE_AGENT_SUMMARIZE_INTERVAL": self._widgets["setting-summarize-interval"].value,
+        })
+        return mapping
+
+    async def _save_env(self, mapping: dict[str, str]) -> None:
+        """一次读写 .env 保存所有键值（API Key 可替换 .env.example 中被注释的模板行）"""
+        await asyncio.to_thread(_rewrite_env_sync, Path(".env"), mapping, _API_KEY_NAMES)
 
     async def _save_profile_form(self) -> None:
         """保存 Profile 表单"""
-        name = self.query_one("#profile-name", Input).value.strip()
+        if self._profile_list is None:
+            return  # Profiles 页未打开过，表单不存在
+        
+        name, profile_data = self._collect_profile_form()
         if not name:
             return
         
+        # 表单与上次加载/保存时一致，无需重写 YAML
+        snapshot = (name, tuple(profile_data.items()))
+        if snapshot == self._profile_snapshot:
+            return
+        
         try:
-            import yaml
-            
             profiles_path = Path("config/profiles.yaml")
-            
-            if profiles_path.exists():
-                with open(profiles_path) as f:
-                    data = yaml.safe_load(f) or {"profiles": {}}
-            else:
-                data = {"profiles": {}}
-            
-            vendor_select = self.query_one("#profile-vendor", Select)
-            protocol_select = self.query_one("#profile-protocol", Select)
-            
-            profile_data = {
-                "vendor": vendor_select.value if vendor_select.value != Select.BLANK else "OpenAI",
-                "protocol": protocol_select.value if protocol_select.value != Select.BLANK else "openai",
-                "model": self.query_one("#profile-model", Input).value,
-                "base_url": self.query_one("#profile-base-url", Input).value or None,
-                "api_key": self.query_one("#profile-api-key", Input).value or None,
-            }
-            
+            data = await asyncio.to_thread(_read_profiles_sync, profiles_path)
             data["profiles"][name] = profile_data
-            
-            with open(profiles_path, "w") as f:
-                yaml.dump(data, f, allow_unicode=True, default_flow_style=False)
+            await asyncio.to_thread(_write_profiles_sync, profiles_path, data)
+            self._profile_snapshot = snapshot
             
         except Exception as e:
             self.notify(f"保存 Profile 失败: {e}", severity="error")
 
-    async def _save_settings(self) -> None:
-        """保存基本设置到 .env"""
-        env_path = Path(".env")
-        
-        existing_lines = []
-        if env_path.exists():
-            existing_lines = env_path.read_text().splitlines()
-        
-        default_profile_select = self.query_one("#setting-default-profile", Select)
-        
-        settings_mapping = {
-            "PHONE_AGENT_DEFAULT_PROFILE": default_profile_select.value if default_profile_select.value != Select.BLANK else "",
-            "PHONE_AGENT_MAX_STEPS": self.query_one("#setting-max-steps", Input).value,
-            "PHONE_AGENT_ACTION_DELAY": self.query_one("#setting-action-delay", Input).value,
-            "PHONE_AGENT_SUMMARIZE_INTERVAL": self.query_one("#setting-summarize-interval", Input).value,
-        }
-        
-        updated_keys = set()
-        new_lines = []
-        
-        for line in existing_lines:
-            updated = False
-            for key, value in settings_mapping.items():
-                if line.startswith(f"{key}="):
-                    if value:
-                        new_lines.append(f"{key}={value}")
-                        updated_keys.add(key)
-                    updated = True
-                    break
-            
-            if not updated:
-                new_lines.append(line)
-        
-        for key, value in settings_mapping.items():
-            if key not in updated_keys and value:
-                new_lines.append(f"{key}={value}")
-        
-        env_path.write_text("\n".join(new_lines) + "\n")
-
-    def action_go_back(self) -> None:
-        """返回主界面"""
-        self.app.pop_screen()
+    async def action_go_back(self) -> None:
+        """返回主界面（等待进行中的保存完成）"""
+        await self._wait_for_save()
+        # dismiss 会触发 push_screen 的回调，主界面据此重新加载 Profile
+        self.dismiss()
 
-    async def action_save_all(self) -> None:
+    def action_save_all(self) -> None:
         """保存所有配置"""
-        await self._save_all()
+        self._request_save()
 
-    def action_quit_app(self) -> None:
-        """退出应用"""
+    async def action_quit_app(self) -> None:
+        """退出应用（等待进行中的保存完成）"""
+        await self._wait_for_save()
         self.app.exit()
@@ -0,0 +1,94 @@
+"""响应缓存（LRUResponseCache / response_cache_key）的单元测试"""
+
+from phone_agent.providers import LRUResponseCache, VLMResponse
+from phone_agent.providers.base import response_cache_key
+from phone_agent.providers.openai_client import OpenAIClient
+
+MESSAGES = [
+    {"role": "system", "content": "你是手机操作助手"},
+    {"role": "user", "content": [{"type": "text", "text": "打开设置"}]},
+]
+SCREENSHOT = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+def _response(name: str) -> VLMResponse:
+    return VLMResponse(thinking=name, raw_content=name)
+
+
+def test_evicts_least_recently_used() -> None:
+    cache = LRUResponseCache(maxsize=2)
+    cache[b"a"] = _response("a")
+    cache[b"b"] = _response("b")
+    cache[b"c"] = _response("c")
+
+    assert list(cache) == [b"b", b"c"]
+    assert b"a" not in cache
+
+
+def test_hit_marks_entry_most_recent() -> None:
+    cache = LRUResponseCache(maxsize=2)
+    cache[b"a"] = _response("a")
+    cache[b"b"] = _response("b")
+
+    assert cache.get(b"a").thinking == "a"
+    cache[b"c"] = _response("c")
+
+    # a 刚被命中，淘汰的是 b
+    assert list(cache) == [b"a", b"c"]
+
+
+def test_overwrite_marks_entry_most_recent() -> None:
+    cache = LRUResponseCache(maxsize=2)
+    cache[b"a"] = _response("a")
+    cache[b"b"] = _response("b")
+    cache[b"a"] = _response("a2")
+    cache[b"c"] = _response("c")
+
+    assert list(cache) == [b"a", b"c"]
+    assert cache[b"a"].thinking == "a2"
+
+
+def test_miss_returns_none() -> None:
+    cache = LRUResponseCache(maxsize=2)
+
+    assert cache.get(b"missing") is None
+    assert len(cache) == 0
+
+
+def test_key_is_stable() -> None:
+    copied = [dict(m) for m in MESSAGES]
+
+    assert response_cache_key(MESSAGES, SCREENSHOT) == response_cache_key(copied, SCREENSHOT)
+    # 字典键顺序不影响 key
+    reordered = [{"content": m["content"], "role": m["role"]} for m in MESSAGES]
+    assert response_cache_key(MESSAGES, SCREENSHOT) == response_cache_key(reordered, SCREENSHOT)
+
+
+def test_changed_screenshot_changes_key() -> None:
+    changed = SCREENSHOT[:-1] + b"\x01"
+
+    assert response_cache_key(MESSAGES, SCREENSHOT) != response_cache_key(MESSAGES, changed)
+    assert response_cache_key(MESSAGES, SCREENSHOT) != response_cache_key(MESSAGES, None)
+
+
+def test_changed_prompt_changes_key() -> None:
+    changed = [MESSAGES[0], {"role": "user", "content": [{"type": "text", "text": "打开相机"}]}]
+
+    assert response_cache_key(MESSAGES, SCREENSHOT) != response_cache_key(changed, SCREENSHOT)
+    assert response_cache_key(MESSAGES, SCREENSHOT) != response_cache_key(MESSAGES[1:], SCREENSHOT)
+
+
+def test_cached_hit_reports_zero_tokens() -> None:
+    client = OpenAIClient(api_key="test-key", model="test-model", response_cache=LRUResponseCache())
+    key, cached = client._get_cached_response(MESSAGES, SCREENSHOT)
+    assert cached is None
+
+    stored = VLMResponse(thinking="t", prompt_tokens=10, completion_tokens=5, total_tokens=15)
+    assert client._store_response(key, stored) is stored
+
+    _, hit = client._get_cached_response(MESSAGES, SCREENSHOT)
+    assert hit is not None
+    assert hit.thinking == "t"
+    assert (hit.prompt_tokens, hit.completion_tokens, hit.total_tokens) == (0, 0, 0)
+    # 缓存中的原始响应不被修改
+    assert stored.total_tokens == 15
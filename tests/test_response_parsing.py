@@ -0,0 +1,86 @@
+"""VLM 响应解析（parse_response / _find_json_object）的单元测试"""
+
+import json
+
+import pytest
+
+from phone_agent.providers import base as base_module
+from phone_agent.providers.base import _find_json_object
+from phone_agent.providers.openai_client import OpenAIClient
+
+EXECUTE_JSON = (
+    '{"phase": "execute", "thinking": "点击设置", '
+    '"action": "tap", "params": {"x": 100, "y": 200}, "note": "忽略"}'
+)
+EXECUTE_RESULT = ("点击设置", {"action": "tap", "params": {"x": 100, "y": 200}})
+
+CASES = [
+    pytest.param(EXECUTE_JSON, EXECUTE_RESULT, id="bare"),
+    pytest.param("  \n" + EXECUTE_JSON + "\n", EXECUTE_RESULT, id="bare-whitespace"),
+    pytest.param(f"```json\n{EXECUTE_JSON}\n```", EXECUTE_RESULT, id="fenced"),
+    pytest.param(f"```\n{EXECUTE_JSON}\n```", EXECUTE_RESULT, id="fenced-no-lang"),
+    pytest.param(f"好的，下一步如下：\n{EXECUTE_JSON}\n以上。", EXECUTE_RESULT, id="after-prose"),
+    pytest.param(
+        '说明 {不是 JSON} 然后 {"thinking": "t", "action": "back"}',
+        ("t", {"action": "back"}),
+        id="skip-invalid-brace",
+    ),
+    pytest.param(
+        '{"phase": "plan", "thinking": "先打开应用", "action": "tap"}',
+        ("先打开应用", {}),
+        id="plan-phase",
+    ),
+    pytest.param(
+        '{"thinking": "旧格式", "action": "swipe", "direction": "up"}',
+        ("旧格式", {"action": "swipe", "direction": "up"}),
+        id="legacy-format",
+    ),
+    pytest.param('{"phase": "finish", "message": "完成"}', ("", {}), id="no-thinking"),
+    pytest.param("我无法完成这个任务", ("", {}), id="no-json"),
+    pytest.param('{"thinking": "截断', ("", {}), id="truncated"),
+    pytest.param("", ("", {}), id="empty"),
+]
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def json_backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """分别在 orjson 与标准库 json 解析路径下运行"""
+    if request.param == "orjson":
+        orjson = pytest.importorskip("orjson")
+        monkeypatch.setattr(base_module, "_json_loads", orjson.loads)
+    else:
+        monkeypatch.setattr(base_module, "_json_loads", json.loads)
+    return request.param
+
+
+@pytest.fixture
+def client() -> OpenAIClient:
+    return OpenAIClient(api_key="test-key", model="test-model")
+
+
+@pytest.mark.parametrize(("raw", "expected"), CASES)
+def test_parse_response(json_backend: str, client: OpenAIClient, raw: str, expected: tuple) -> None:
+    assert client.parse_response(raw) == expected
+
+
+@pytest.mark.parametrize(("raw", "expected"), CASES)
+def test_backends_agree(
+    monkeypatch: pytest.MonkeyPatch, client: OpenAIClient, raw: str, expected: tuple
+) -> None:
+    orjson = pytest.importorskip("orjson")
+    monkeypatch.setattr(base_module, "_json_loads", orjson.loads)
+    fast = client.parse_response(raw), _find_json_object(raw.lstrip())
+    monkeypatch.setattr(base_module, "_json_loads", json.loads)
+    slow = client.parse_response(raw), _find_json_object(raw.lstrip())
+    assert fast == slow
+
+
+def test_find_json_object_nested(json_backend: str) -> None:
+    text = 'prefix {"a": {"b": [1, {"c": "}"}]}} suffix {"d": 2}'
+    assert _find_json_object(text) == {"a": {"b": [1, {"c": "}"}]}}
+
+
+def test_find_json_object_trailing_text(json_backend: str) -> None:
+    # 整体解析失败时回退到 raw_decode，只取第一个完整对象
+    assert _find_json_object('{"a": 1} trailing {"b": 2}') == {"a": 1}
+    assert _find_json_object("[1, 2]") is None
@@ -0,0 +1,137 @@
+""".env 重写与原子写入（settings 界面）的测试"""
+
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from phone_agent.tui.screens.settings import _atomic_write_bytes, _rewrite_env_sync
+
+ENV_TEXT = """\
+# 模型配置
+PHONE_AGENT_MAX_STEPS=50
+
+OPENAI_API_KEY=old-openai
+  ANTHROPIC_API_KEY=old-anthropic
+# GEMINI_API_KEY=
+#OTHER_KEY=keep-me
+UNRELATED=1
+"""
+
+
+@pytest.fixture
+def env_path(tmp_path: Path) -> Path:
+    path = tmp_path / ".env"
+    path.write_text(ENV_TEXT, encoding="utf-8")
+    return path
+
+
+def test_replaces_values_in_place(env_path: Path) -> None:
+    _rewrite_env_sync(env_path, {"OPENAI_API_KEY": "new-openai", "PHONE_AGENT_MAX_STEPS": "80"})
+
+    assert env_path.read_text(encoding="utf-8") == ENV_TEXT.replace(
+        "OPENAI_API_KEY=old-openai", "OPENAI_API_KEY=new-openai"
+    ).replace("PHONE_AGENT_MAX_STEPS=50", "PHONE_AGENT_MAX_STEPS=80")
+
+
+def test_indented_key_is_normalised(env_path: Path) -> None:
+    _rewrite_env_sync(env_path, {"ANTHROPIC_API_KEY": "new-anthropic"})
+
+    lines = env_path.read_text(encoding="utf-8").splitlines()
+    assert "ANTHROPIC_API_KEY=new-anthropic" in lines
+    assert "  ANTHROPIC_API_KEY=old-anthropic" not in lines
+
+
+def test_appends_missing_keys(env_path: Path) -> None:
+    _rewrite_env_sync(env_path, {"PHONE_AGENT_LANG": "zh", "OPENAI_API_KEY": "old-openai"})
+
+    assert env_path.read_text(encoding="utf-8") == ENV_TEXT + "PHONE_AGENT_LANG=zh\n"
+
+
+def test_keeps_comments_and_blank_lines(env_path: Path) -> None:
+    _rewrite_env_sync(env_path, {"UNRELATED": "2", "OTHER_KEY": "x"})
+
+    lines = env_path.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "# 模型配置"
+    assert lines[2] == ""
+    # 未列入 commented_keys 的注释行原样保留，新值追加到末尾
+    assert "#OTHER_KEY=keep-me" in lines
+    assert lines[-1] == "OTHER_KEY=x"
+    assert "UNRELATED=2" in lines
+
+
+def test_commented_key_is_filled_in_place(env_path: Path) -> None:
+    _rewrite_env_sync(env_path, {"GEMINI_API_KEY": "g"}, frozenset({"GEMINI_API_KEY"}))
+
+    assert env_path.read_text(encoding="utf-8") == ENV_TEXT.replace(
+        "# GEMINI_API_KEY=", "GEMINI_API_KEY=g"
+    )
+
+
+def test_empty_value_and_duplicates_are_removed(tmp_path: Path) -> None:
+    path = tmp_path / ".env"
+    path.write_text("A=1\nB=2\nA=3\nC=4\n", encoding="utf-8")
+
+    _rewrite_env_sync(path, {"A": "9", "B": ""})
+
+    assert path.read_text(encoding="utf-8") == "A=9\nC=4\n"
+
+
+def test_creates_missing_file(tmp_path: Path) -> None:
+    path = tmp_path / ".env"
+
+    _rewrite_env_sync(path, {"A": "1", "B": ""})
+
+    assert path.read_text(encoding="utf-8") == "A=1\n"
+
+
+def test_crlf_input(tmp_path: Path) -> None:
+    path = tmp_path / ".env"
+    path.write_bytes(b"# c\r\nA=1\r\nB=2\r\n")
+
+    _rewrite_env_sync(path, {"A": "5"})
+
+    assert path.read_bytes() == b"# c\nA=5\nB=2\n"
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX 权限位")
+def test_preserves_file_mode(env_path: Path) -> None:
+    env_path.chmod(0o600)
+
+    _rewrite_env_sync(env_path, {"OPENAI_API_KEY": "new-openai"})
+
+    assert stat.S_IMODE(env_path.stat().st_mode) == 0o600
+
+
+@pytest.mark.skipif(os.name == "nt", reason="需要符号链接权限")
+def test_preserves_symlink(tmp_path: Path, env_path: Path) -> None:
+    link = tmp_path / "link.env"
+    link.symlink_to(env_path)
+
+    _rewrite_env_sync(link, {"OPENAI_API_KEY": "new-openai"})
+
+    assert link.is_symlink()
+    assert link.resolve() == env_path.resolve()
+    assert "OPENAI_API_KEY=new-openai" in env_path.read_text(encoding="utf-8")
+
+
+def test_atomic_write_leaves_no_temp_file(tmp_path: Path) -> None:
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"old")
+
+    _atomic_write_bytes(path, bytearray(b"new"))
+
+    assert path.read_bytes() == b"new"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.bin"]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX 权限位")
+def test_atomic_write_new_file_uses_default_mode(tmp_path: Path) -> None:
+    path = tmp_path / "new.bin"
+    umask = os.umask(0)
+    os.umask(umask)
+
+    _atomic_write_bytes(path, b"data")
+
+    assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~umask
@@ -0,0 +1,106 @@
+"""settings 界面保存合并的 pilot 测试"""
+
+import shutil
+import threading
+from pathlib import Path
+
+import pytest
+from textual.app import App
+
+from phone_agent.tui.screens import settings as settings_module
+from phone_agent.tui.screens.settings import SettingsScreen
+
+CONFIG_DIR = Path(__file__).resolve().parents[1] / "config"
+
+
+class _SettingsApp(App):
+    def on_mount(self) -> None:
+        self.push_screen(SettingsScreen())
+
+
+@pytest.fixture
+def write_gate() -> threading.Event:
+    """放行 .env 写入的开关，未放行前写入一直阻塞"""
+    return threading.Event()
+
+
+@pytest.fixture
+def env_writes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, write_gate: threading.Event
+) -> list[Path]:
+    """在临时目录中运行，并记录（受 write_gate 控制的）.env 写入次数"""
+    shutil.copytree(CONFIG_DIR, tmp_path / "config")
+    (tmp_path / ".env").write_text("PHONE_AGENT_MAX_STEPS=50\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    writes: list[Path] = []
+    rewrite = settings_module._rewrite_env_sync
+
+    def slow_rewrite(env_path: Path, *args: object) -> None:
+        write_gate.wait(5)  # 模拟慢速磁盘，让后续按键在保存期间到达
+        writes.append(env_path)
+        rewrite(env_path, *args)
+
+    monkeypatch.setattr(settings_module, "_rewrite_env_sync", slow_rewrite)
+    return writes
+
+
+async def _wait_for_save(screen: SettingsScreen) -> None:
+    while screen._save_task is not None and not screen._save_task.done():
+        await screen._save_task
+
+
+@pytest.mark.asyncio
+async def test_rapid_ctrl_s_collapses_into_one_trailing_save(
+    env_writes: list[Path], write_gate: threading.Event
+) -> None:
+    app = _SettingsApp()
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        screen = app.screen
+        assert isinstance(screen, SettingsScreen)
+
+        for _ in range(5):
+            await pilot.press("ctrl+s")
+        write_gate.set()
+        await _wait_for_save(screen)
+
+    # 第一次保存 + 合并后的一次后续保存
+    assert len(env_writes) == 2
+
+
+@pytest.mark.asyncio
+async def test_rapid_save_clicks_collapse_into_one_trailing_save(
+    env_writes: list[Path], write_gate: threading.Event
+) -> None:
+    app = _SettingsApp()
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        screen = app.screen
+        assert isinstance(screen, SettingsScreen)
+
+        for _ in range(5):
+            await pilot.click("#btn-save")
+        write_gate.set()
+        await _wait_for_save(screen)
+
+    assert len(env_writes) == 2
+
+
+@pytest.mark.asyncio
+async def test_go_back_waits_for_running_save(
+    env_writes: list[Path], write_gate: threading.Event
+) -> None:
+    app = _SettingsApp()
+    async with app.run_test() as pilot:
+        await pilot.pause()
+
+        await pilot.press("ctrl+s")
+        # 返回操作等待保存期间放行写入
+        threading.Timer(0.2, write_gate.set).start()
+        await pilot.press("escape")
+        await pilot.pause()
+
+        assert not isinstance(app.screen, SettingsScreen)
+        assert len(env_writes) == 1
+        assert "PHONE_AGENT_MAX_STEPS=50" in Path(".env").read_text(encoding="utf-8")
@@ -0,0 +1,69 @@
+"""profiles.yaml 写入（settings 界面）的往返测试"""
+
+from pathlib import Path
+
+import pytest
+import yaml
+
+from phone_agent.tui.screens.settings import (
+    _emit_profiles_yaml,
+    _read_profiles_sync,
+    _write_profiles_sync,
+)
+
+PROFILES_YAML = Path(__file__).resolve().parents[1] / "config" / "profiles.yaml"
+
+
+def test_repo_profiles_round_trip() -> None:
+    data = yaml.safe_load(PROFILES_YAML.read_text(encoding="utf-8"))
+    text = _emit_profiles_yaml(data)
+    assert text is not None
+    assert yaml.safe_load(text) == data
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "火山方舟",
+        'quote " and \\ backslash',
+        "line\nbreak\ttab\x00nul",
+        "yes",
+        "NULL",
+        "-leading-dash",
+        "a: b # not a comment",
+        "${VOLCANO_API_KEY}",
+        "",
+    ],
+)
+def test_emitted_scalars_round_trip(value: str) -> None:
+    data = {"profiles": {"p": {"description": value, "is_free": True, "n": 3, "api_key": None}}}
+    text = _emit_profiles_yaml(data)
+    assert text is not None
+    assert yaml.safe_load(text) == data
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["del\x7f", "c1\x80", "nel\x85", "c1\x9f", "ls\u2028", "bom\ufeff", "nonchar\uffff"],
+)
+def test_unsafe_characters_fall_back_to_yaml_dump(value: str, tmp_path: Path) -> None:
+    data = {"profiles": {"p": {"description": value}}}
+    assert _emit_profiles_yaml(data) is None
+
+    path = tmp_path / "profiles.yaml"
+    _write_profiles_sync(path, data)
+    assert _read_profiles_sync(path) == data
+
+
+@pytest.mark.parametrize("value", [[1, 2], 1.5])
+def test_unsupported_values_fall_back(value: object) -> None:
+    assert _emit_profiles_yaml({"profiles": {"p": {"x": value}}}) is None
+
+
+def test_lone_surrogate_is_rejected_without_touching_file(tmp_path: Path) -> None:
+    path = tmp_path / "profiles.yaml"
+    path.write_text("profiles: {}\n", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        _write_profiles_sync(path, {"profiles": {"p": {"description": "bad\ud800"}}})
+    assert path.read_text(encoding="utf-8") == "profiles: {}\n"